@@ -1,23 +1,53 @@
-import mysql.connector
+import os
 from flask import Flask, jsonify, request
-from config import db, DATABASE_URL, SECRET_KEY
+from sqlalchemy import text
+from config import (
+    db, DATABASE_URL, SQLALCHEMY_ENGINE_OPTIONS, SECRET_KEY,
+    MAIL_SERVER, MAIL_PORT, MAIL_USE_TLS, MAIL_USERNAME, MAIL_PASSWORD, MAIL_DEFAULT_SENDER
+)
+from db_pool import pool_status
+from query_stats import init_query_stats, endpoint_stats
+from metrics import init_metrics
+from commands import (
+    check_indexes, rebuild_pipeline_command, check_pipeline_command, run_jobs_command, enqueue_job_command
+)
+import job_handlers  # registers the background job handlers
+from serializers import FastJSONProvider
 from flask_jwt_extended import JWTManager
+from flask_migrate import Migrate
 from flask_cors import CORS
 from flasgger import Swagger
 
 app = Flask(__name__)
+app.json = FastJSONProvider(app)
 app.config["SQLALCHEMY_DATABASE_URI"] = DATABASE_URL
+app.config["SQLALCHEMY_ENGINE_OPTIONS"] = SQLALCHEMY_ENGINE_OPTIONS
 app.config["SECRET_KEY"] = SECRET_KEY
 app.config["JWT_SECRET_KEY"] = SECRET_KEY  # Used for JWT Authentication
 app.config['JWT_ALGORITHM'] = 'HS256'
 app.config['JWT_DECODE_ALGORITHMS'] = ['HS256']
 app.config["JWT_VERIFY_SUB"] = False
+app.config.update(
+    MAIL_SERVER=MAIL_SERVER, MAIL_PORT=MAIL_PORT, MAIL_USE_TLS=MAIL_USE_TLS,
+    MAIL_USERNAME=MAIL_USERNAME, MAIL_PASSWORD=MAIL_PASSWORD, MAIL_DEFAULT_SENDER=MAIL_DEFAULT_SENDER
+)
 
 CORS(app, resources={r"/*": {"origins": "*"}}, supports_credentials=True)
 
 jwt = JWTManager(app)
 db.init_app(app)
+migrate = Migrate(app, db)
+app.cli.add_command(check_indexes)
+app.cli.add_command(rebuild_pipeline_command)
+app.cli.add_command(check_pipeline_command)
+app.cli.add_command(run_jobs_command)
+app.cli.add_command(enqueue_job_command)
+if MAIL_SERVER:
+    from flask_mail import Mail
+    Mail(app)
 swagger = Swagger(app)
+init_query_stats(app)
+init_metrics(app)
 
 @app.before_request
 def handle_preflight():
@@ -29,14 +59,6 @@ def handle_preflight():
         response.headers.add("Access-Control-Allow-Credentials", "true")
         return response
 
-def get_db_connection():
-    return mysql.connector.connect(
-        host="crm-db.cjqkqqq0a1xc.ap-southeast-1.rds.amazonaws.com",
-        user="admin",
-        password="crmdatabase",
-        database="crm_db"
-    )
-
 from routes.communication import communication
 from routes.projects import projects
 from routes.reports import reports
@@ -65,5 +87,21 @@ app.register_blueprint(support_requests, url_prefix="/support_requests")
 def home():
     return {"message": "CRM Backend Running"}
 
+@app.route('/health/db')
+def db_health():
+    """Pings the database and reports this worker's connection pool utilization."""
+    try:
+        db.session.execute(text("SELECT 1"))
+        status = "ok"
+    except Exception as e:
+        status = f"error: {e.__class__.__name__}"
+    return jsonify({"status": status, "pool": pool_status(db.engine)}), 200 if status == "ok" else 503
+
+@app.route('/health/queries')
+def query_health():
+    """Reports query count and database time per endpoint, for this worker process only."""
+    return jsonify({"pid": os.getpid(), "endpoints": endpoint_stats.snapshot()})
+
+# Development server only; in production run `gunicorn app:app` (settings in gunicorn.conf.py)
 if __name__ == '__main__':
     app.run(host="0.0.0.0", port=5000, debug=True)
@@ -0,0 +1,358 @@
+"""
+Drives every blueprint's routes against a seeded database and records p50/p95/p99 latency,
+throughput, database time and peak RSS per endpoint as JSON, for comparison between commits.
+
+    cd backend
+    DATABASE_URL=sqlite:////tmp/bench.db python benchmarks/bench_endpoints.py --seed-data --profile small
+    DATABASE_URL=sqlite:////tmp/bench.db python benchmarks/bench_endpoints.py --compare benchmarks/results/abc1234.json
+
+By default requests go through the Flask test client in this process. With --url they go over
+HTTP to a running server instead (e.g. gunicorn); pass --server-pid to sample that process's RSS.
+Routes that return whole tables (GET /customers/, exports, ...) only run with --full-lists.
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import re
+import subprocess
+import sys
+import threading
+import time
+import uuid
+from collections import namedtuple
+from datetime import datetime, timezone
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from sqlalchemy import func, select
+from app import app
+from config import db
+from models import Customer, Project, SalesOpportunity, User
+from utils import encode_cursor
+from synthetic_data import PASSWORD, WORDS, TAGS, INDUSTRIES, add_volume_arguments, parse_volumes, seed, user_email
+
+RESULTS_FOLDER = os.path.join(os.path.dirname(__file__), "results")
+SERVER_TIMING_DB = re.compile(r'db;dur=([\d.]+);desc="(\d+) queries"')
+
+# request(rng, ids) returns (path, keyword arguments for the client); full routes read whole tables
+Scenario = namedtuple("Scenario", "name method request expected full", defaults=(200, False))
+
+def pick(rng, ids, table):
+    low, high = ids[table]
+    return rng.randint(low, high)
+
+SCENARIOS = [
+    # customers
+    Scenario("customers.page", "GET", lambda rng, ids: (
+        f"/customers/?limit=50&cursor={encode_cursor({'id': pick(rng, ids, 'customers')})}", {})),
+    Scenario("customers.filter_industry", "GET", lambda rng, ids: (
+        f"/customers/?industry={rng.choice(INDUSTRIES)}&limit=50", {})),
+    Scenario("customers.filter_tag", "GET", lambda rng, ids: (f"/customers/?tag={rng.choice(TAGS)}&limit=50", {})),
+    Scenario("customers.search", "GET", lambda rng, ids: (f"/customers/search?q={rng.choice(WORDS)}&limit=20", {})),
+    Scenario("customers.detail", "GET", lambda rng, ids: (f"/customers/{pick(rng, ids, 'customers')}", {})),
+    Scenario("customers.create", "POST", lambda rng, ids: ("/customers/", {"json": {
+        "name": "Bench Customer", "email": f"bench-{uuid.uuid4().hex}@example.com", "company": "Bench Co",
+        "industry": rng.choice(INDUSTRIES), "tags": rng.choice(TAGS)}}), 201),
+    Scenario("customers.list_all", "GET", lambda rng, ids: ("/customers/", {}), full=True),
+    Scenario("customers.export", "GET", lambda rng, ids: ("/customers/export", {}), full=True),
+    # interactions
+    Scenario("interactions.by_customer", "GET", lambda rng, ids: (
+        f"/interactions/{pick(rng, ids, 'customers')}", {})),
+    Scenario("interactions.create", "POST", lambda rng, ids: (f"/interactions/{pick(rng, ids, 'customers')}", {
+        "data": {"interaction_type": "Call", "details": "Benchmark call"}}), 201),
+    # communication
+    Scenario("communication.list_all", "GET", lambda rng, ids: ("/communication/", {}), full=True),
+    # sales_opportunity
+    Scenario("sales_opportunity.by_customer", "GET", lambda rng, ids: (
+        f"/sales_opportunity/customer/{pick(rng, ids, 'customers')}", {})),
+    Scenario("sales_opportunity.list_all", "GET", lambda rng, ids: ("/sales_opportunity/", {}), full=True),
+    # projects, tasks, update_logs, support_requests
+    Scenario("projects.detail", "GET", lambda rng, ids: (
+        f"/projects/{pick(rng, ids, 'projects')}?include=tasks,update_logs,support_requests,funding", {})),
+    Scenario("projects.by_customer", "GET", lambda rng, ids: (
+        f"/projects/customers/{pick(rng, ids, 'customers')}", {})),
+    Scenario("projects.funding", "GET", lambda rng, ids: (f"/projects/{pick(rng, ids, 'projects')}/funding", {})),
+    Scenario("projects.list_all", "GET", lambda rng, ids: ("/projects/", {}), full=True),
+    Scenario("tasks.by_project", "GET", lambda rng, ids: (f"/tasks/projects/{pick(rng, ids, 'projects')}", {})),
+    Scenario("update_logs.by_project", "GET", lambda rng, ids: (
+        f"/update_logs/projects/{pick(rng, ids, 'projects')}", {})),
+    Scenario("support_requests.by_project", "GET", lambda rng, ids: (
+        f"/support_requests/projects/{pick(rng, ids, 'projects')}", {})),
+    # reports
+    Scenario("reports.sales_summary", "GET", lambda rng, ids: ("/reports/sales_summary", {})),
+    Scenario("reports.customer_distribution", "GET", lambda rng, ids: ("/reports/customer_distribution", {})),
+    Scenario("reports.project_budget", "GET", lambda rng, ids: ("/reports/project_budget", {})),
+    Scenario("reports.dashboard", "GET", lambda rng, ids: ("/reports/dashboard", {})),
+    Scenario("reports.pipeline", "GET", lambda rng, ids: ("/reports/pipeline", {})),
+    # users
+    Scenario("users.detail", "GET", lambda rng, ids: (f"/users/{pick(rng, ids, 'users')}", {})),
+    Scenario("users.profile", "GET", lambda rng, ids: ("/users/profile", {})),
+    Scenario("users.login", "POST", lambda rng, ids: ("/users/login", {"json": {
+        "email": user_email(pick(rng, ids, "users") - ids["users"][0]), "password": PASSWORD}})),
+    Scenario("health.db", "GET", lambda rng, ids: ("/health/db", {})),
+]
+
+class TestClientTransport:
+    """Sends requests through a Flask test client (one per thread) in this process."""
+
+    def __init__(self, headers):
+        self.headers = headers
+        self.local = threading.local()
+
+    def __call__(self, method, path, kwargs):
+        client = getattr(self.local, "client", None) or app.test_client()
+        self.local.client = client
+        response = client.open(path, method=method, headers=self.headers, **kwargs)
+        return response.status_code, response.headers.get("Server-Timing"), len(response.get_data())
+
+class HTTPTransport:
+    """Sends requests over HTTP to a running server, with one keep-alive session per thread."""
+
+    def __init__(self, base_url, headers):
+        import requests
+        self.requests = requests
+        self.base_url = base_url.rstrip("/")
+        self.headers = headers
+        self.local = threading.local()
+
+    def __call__(self, method, path, kwargs):
+        session = getattr(self.local, "session", None) or self.requests.Session()
+        self.local.session = session
+        response = session.request(method, self.base_url + path, headers=self.headers, **kwargs)
+        return response.status_code, response.headers.get("Server-Timing"), len(response.content)
+
+class RSSSampler:
+    """Samples a process's resident set size every interval seconds; peak() is the largest seen, in MiB."""
+
+    def __init__(self, pid, interval=0.02):
+        self.pid = pid
+        self.interval = interval
+        self.samples = []
+        self.stop = threading.Event()
+        self.thread = threading.Thread(target=self.run, daemon=True)
+
+    def rss(self):
+        try:
+            with open(f"/proc/{self.pid}/status") as status:
+                for line in status:
+                    if line.startswith("VmRSS:"):
+                        return int(line.split()[1]) / 1024
+        except OSError:
+            pass
+        if self.pid == os.getpid():
+            # No /proc (macOS): the lifetime peak is the best available
+            import resource
+            peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+            return peak / (1024 * 1024 if sys.platform == "darwin" else 1024)
+        return None
+
+    def run(self):
+        while not self.stop.is_set():
+            value = self.rss()
+            if value is not None:
+                self.samples.append(value)
+            self.stop.wait(self.interval)
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.stop.set()
+        self.thread.join()
+        value = self.rss()
+        if value is not None:
+            self.samples.append(value)
+
+    def peak(self):
+        return round(max(self.samples), 1) if self.samples else None
+
+def percentile(ordered, fraction):
+    if not ordered:
+        return None
+    return ordered[min(len(ordered) - 1, int(round(fraction * (len(ordered) - 1))))]
+
+def run_scenario(scenario, send, ids, requests, concurrency, warmup, seed, server_pid):
+    rng = random.Random(f"{seed}:{scenario.name}")
+    planned = [scenario.request(rng, ids) for _ in range(warmup + requests)]
+    for path, kwargs in planned[:warmup]:
+        send(scenario.method, path, kwargs)
+
+    latencies, statuses, db_ms, queries, sizes = [], [], [], [], []
+    lock = threading.Lock()
+
+    def worker(offset):
+        for path, kwargs in planned[warmup + offset::concurrency]:
+            started = time.perf_counter()
+            status, server_timing, size = send(scenario.method, path, kwargs)
+            elapsed = time.perf_counter() - started
+            match = SERVER_TIMING_DB.search(server_timing or "")
+            with lock:
+                latencies.append(elapsed)
+                statuses.append(status)
+                sizes.append(size)
+                if match:
+                    db_ms.append(float(match.group(1)))
+                    queries.append(int(match.group(2)))
+
+    threads = [threading.Thread(target=worker, args=(n,)) for n in range(concurrency)]
+    with RSSSampler(server_pid or os.getpid()) as sampler:
+        started = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        wall = time.perf_counter() - started
+
+    ordered = sorted(latencies)
+    ms = lambda seconds: round(seconds * 1000, 3) if seconds is not None else None
+    return {
+        "method": scenario.method,
+        "requests": len(latencies),
+        "errors": sum(status != scenario.expected for status in statuses),
+        "statuses": {str(status): statuses.count(status) for status in sorted(set(statuses))},
+        "p50_ms": ms(percentile(ordered, 0.50)),
+        "p95_ms": ms(percentile(ordered, 0.95)),
+        "p99_ms": ms(percentile(ordered, 0.99)),
+        "mean_ms": ms(sum(ordered) / len(ordered)) if ordered else None,
+        "max_ms": ms(ordered[-1]) if ordered else None,
+        "throughput_rps": round(len(latencies) / wall, 2) if wall else None,
+        "db_mean_ms": round(sum(db_ms) / len(db_ms), 3) if db_ms else None,
+        "queries_mean": round(sum(queries) / len(queries), 2) if queries else None,
+        "response_bytes_mean": round(sum(sizes) / len(sizes)) if sizes else None,
+        "peak_rss_mb": sampler.peak(),
+    }
+
+def id_ranges():
+    ranges = {}
+    for name, column in (("customers", Customer.id), ("projects", Project.id),
+                         ("sales_opportunity", SalesOpportunity.id), ("users", User.id)):
+        low, high = db.session.execute(select(func.min(column), func.max(column))).one()
+        if low is None:
+            raise SystemExit(f"{name} is empty; seed the database first (--seed-data)")
+        ranges[name] = (low, high)
+    db.session.remove()
+    return ranges
+
+def table_counts():
+    counts = {
+        table.name: db.session.execute(select(func.count()).select_from(table)).scalar()
+        for table in db.metadata.sorted_tables
+    }
+    db.session.remove()
+    return counts
+
+def git_revision():
+    root = os.path.dirname(os.path.abspath(__file__))
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=root,
+                                capture_output=True, text=True, check=True).stdout.strip()
+        dirty = bool(subprocess.run(["git", "status", "--porcelain", "--untracked-files=no"], cwd=root,
+                                    capture_output=True, text=True, check=True).stdout.strip())
+    except (OSError, subprocess.CalledProcessError):
+        return None, None
+    return commit, dirty
+
+def compare(results, baseline_path, threshold):
+    """Prints p95 and throughput changes against a previous run; returns the regressed endpoints."""
+    with open(baseline_path) as f:
+        baseline = json.load(f)
+    print(f"\nCompared with {baseline.get('commit')} ({baseline_path}), regression threshold {threshold:.0%}")
+    print(f"  {'endpoint':<34} {'p95 before':>11} {'p95 now':>10} {'change':>8} {'rps change':>11}")
+    regressed = []
+    for name, now in results["endpoints"].items():
+        before = baseline.get("endpoints", {}).get(name)
+        if not before or not before.get("p95_ms") or not now.get("p95_ms"):
+            continue
+        change = now["p95_ms"] / before["p95_ms"] - 1
+        rps_change = now["throughput_rps"] / before["throughput_rps"] - 1 if before.get("throughput_rps") else 0
+        flag = "  REGRESSED" if change > threshold else ""
+        if flag:
+            regressed.append(name)
+        print(f"  {name:<34} {before['p95_ms']:9.1f}ms {now['p95_ms']:8.1f}ms {change:+7.0%} {rps_change:+10.0%}{flag}")
+    return regressed
+
+def log_in(url=None):
+    """Access token for the first bench user, for routes that need one."""
+    credentials = {"email": user_email(0), "password": PASSWORD}
+    if url:
+        import requests
+        return requests.post(url.rstrip("/") + "/users/login", json=credentials).json().get("token")
+    return (app.test_client().post("/users/login", json=credentials).get_json() or {}).get("token")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=200, help="measured requests per endpoint")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--warmup", type=int, default=10)
+    parser.add_argument("--only", help="regex; run only endpoints whose name matches")
+    parser.add_argument("--full-lists", action="store_true", help="also run routes that return whole tables")
+    parser.add_argument("--url", help="benchmark a running server at this base URL instead of the test client")
+    parser.add_argument("--server-pid", type=int, help="with --url, the server process whose RSS to sample")
+    parser.add_argument("--output", help="result file (default benchmarks/results/<commit>.json)")
+    parser.add_argument("--compare", metavar="BASELINE", help="a previous result file to compare with")
+    parser.add_argument("--threshold", type=float, default=0.2, help="p95 slowdown counted as a regression")
+    parser.add_argument("--seed-data", action="store_true",
+                        help="recreate the schema and seed it with synthetic data first (see --profile)")
+    add_volume_arguments(parser)
+    args = parser.parse_args()
+
+    with app.app_context():
+        if args.seed_data:
+            seed(parse_volumes(args), args.seed, reset=True)
+        ids = id_ranges()
+        volumes = table_counts()
+        database = db.engine.dialect.name
+
+    token = log_in(args.url)
+    headers = {"Authorization": f"Bearer {token}"} if token else {}
+    send = HTTPTransport(args.url, headers) if args.url else TestClientTransport(headers)
+
+    scenarios = [
+        s for s in SCENARIOS
+        if (args.full_lists or not s.full) and (not args.only or re.search(args.only, s.name))
+    ]
+    commit, dirty = git_revision()
+    results = {
+        "commit": commit,
+        "dirty": dirty,
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+        "database": database,
+        "transport": args.url or "test_client",
+        "requests": args.requests,
+        "concurrency": args.concurrency,
+        "warmup": args.warmup,
+        "seed": args.seed,
+        "volumes": volumes,
+        "endpoints": {},
+    }
+
+    print(f"{database}, {volumes.get('customers', 0):,} customers, {args.requests} requests x "
+          f"{args.concurrency} concurrent per endpoint, commit {commit}{' (dirty)' if dirty else ''}")
+    print(f"  {'endpoint':<34} {'p50':>8} {'p95':>8} {'p99':>8} {'req/s':>8} {'queries':>7} {'rss MiB':>8} {'err':>4}")
+    for scenario in scenarios:
+        r = run_scenario(scenario, send, ids, args.requests, args.concurrency, args.warmup,
+                         args.seed, args.server_pid if args.url else None)
+        results["endpoints"][scenario.name] = r
+        print(f"  {scenario.name:<34} {r['p50_ms']:7.1f}ms {r['p95_ms']:7.1f}ms {r['p99_ms']:7.1f}ms "
+              f"{r['throughput_rps']:8.1f} {r['queries_mean'] if r['queries_mean'] is not None else '-':>7} "
+              f"{r['peak_rss_mb'] if r['peak_rss_mb'] is not None else '-':>8} {r['errors']:4d}")
+
+    output = args.output or os.path.join(RESULTS_FOLDER, f"{commit or 'unknown'}{'-dirty' if dirty else ''}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w") as f:
+        json.dump(results, f, indent=2, sort_keys=True)
+    print(f"Saved {output}")
+
+    if args.compare:
+        regressed = compare(results, args.compare, args.threshold)
+        if regressed:
+            raise SystemExit(f"{len(regressed)} endpoint(s) regressed: {', '.join(regressed)}")
+
+if __name__ == "__main__":
+    main()
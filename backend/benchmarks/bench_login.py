@@ -0,0 +1,110 @@
+"""
+Login throughput under concurrency, and how long other requests on the same worker wait
+while a login burst is in progress, with bcrypt run inline versus on the hashing pool.
+
+    cd backend
+    DATABASE_URL=sqlite:////tmp/bench_login.db python benchmarks/bench_login.py --logins 64 --concurrency 16
+    DATABASE_URL=sqlite:////tmp/bench_login.db python benchmarks/bench_login.py --gevent
+
+--gevent monkey-patches first, like a gevent gunicorn worker: inline bcrypt then blocks the
+whole hub, which shows up as probe latency.
+"""
+import sys
+
+if "--gevent" in sys.argv:
+    from gevent import monkey
+    monkey.patch_all()
+
+import argparse
+import os
+import threading
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from app import app
+from config import db, BCRYPT_ROUNDS, BCRYPT_POOL_SIZE
+from models import User
+from passwords import bcrypt, hashing_pool
+
+PASSWORD = "password123"
+PROBE_INTERVAL = 0.005
+
+def seed(users):
+    db.create_all()
+    password_hash = bcrypt.generate_password_hash(PASSWORD, BCRYPT_ROUNDS).decode("utf-8")
+    for i in range(users):
+        email = f"bench{i}@example.com"
+        if not User.query.filter_by(email=email).first():
+            db.session.add(User(name=f"Bench {i}", email=email, password=password_hash, role="Sales"))
+    db.session.commit()
+
+def percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))] if ordered else 0.0
+
+def burst(pool_size, logins, concurrency, users):
+    """Runs logins across concurrency clients while a probe requests GET /health/db every few ms."""
+    hashing_pool.size = pool_size
+    client = app.test_client()
+    failures = []
+    probe_latencies = []
+    done = threading.Event()
+
+    def log_in(worker):
+        for i in range(worker, logins, concurrency):
+            response = client.post("/users/login", json={"email": f"bench{i % users}@example.com", "password": PASSWORD})
+            if response.status_code != 200:
+                failures.append(response.status_code)
+
+    def probe():
+        # Latency is measured from when the probe was due, so time spent waiting for the
+        # worker (e.g. a gevent hub blocked by inline bcrypt) counts against it
+        while not done.is_set():
+            due = time.perf_counter() + PROBE_INTERVAL
+            time.sleep(PROBE_INTERVAL)
+            client.get("/health/db")
+            probe_latencies.append(time.perf_counter() - due)
+
+    prober = threading.Thread(target=probe)
+    workers = [threading.Thread(target=log_in, args=(n,)) for n in range(concurrency)]
+    prober.start()
+    started = time.perf_counter()
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    elapsed = time.perf_counter() - started
+    done.set()
+    prober.join()
+    return {
+        "logins_per_second": logins / elapsed,
+        "failures": len(failures),
+        "probe_p50_ms": percentile(probe_latencies, 0.50) * 1000,
+        "probe_p95_ms": percentile(probe_latencies, 0.95) * 1000,
+        "probe_max_ms": max(probe_latencies, default=0.0) * 1000,
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--logins", type=int, default=64)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--users", type=int, default=16)
+    parser.add_argument("--pool-size", type=int, default=BCRYPT_POOL_SIZE or os.cpu_count())
+    parser.add_argument("--gevent", action="store_true", help="monkey-patch with gevent before running")
+    args = parser.parse_args()
+
+    with app.app_context():
+        seed(args.users)
+    modes = {"inline": 0, f"pool ({args.pool_size} threads)": args.pool_size}
+    results = {name: burst(size, args.logins, args.concurrency, args.users) for name, size in modes.items()}
+
+    print(f"{args.logins} logins, {args.concurrency} concurrent, bcrypt cost {BCRYPT_ROUNDS}"
+          f"{', gevent' if args.gevent else ''}")
+    print(f"  {'mode':<22} {'logins/s':>9} {'fail':>5} {'probe p50':>10} {'probe p95':>10} {'probe max':>10}")
+    for name, r in results.items():
+        print(f"  {name:<22} {r['logins_per_second']:9.1f} {r['failures']:5d} {r['probe_p50_ms']:8.1f}ms"
+              f" {r['probe_p95_ms']:8.1f}ms {r['probe_max_ms']:8.1f}ms")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""
+Compares the old ORM + dict-comprehension + stdlib jsonify path with the
+column serializers + FastJSONProvider path on a large customer list.
+
+    cd backend
+    DATABASE_URL=sqlite:////tmp/bench.db python benchmarks/bench_serializers.py --rows 100000
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from flask.json.provider import DefaultJSONProvider
+from sqlalchemy import insert
+from app import app
+from config import db
+from models import Customer
+from serializers import customer_serializer
+
+def legacy_customers():
+    return [
+        {
+            "id": c.id,
+            "name": c.name,
+            "email": c.email,
+            "phone": c.phone,
+            "company": c.company,
+            "industry": c.industry,
+            "location": c.location,
+            "tags": c.tags,
+            "technical_evaluator": c.technical_evaluator,
+            "created_at": c.created_at,
+            "address": c.address
+        }
+        for c in Customer.query.order_by(Customer.id).all()
+    ]
+
+def seed(rows):
+    db.create_all()
+    existing = db.session.query(db.func.count(Customer.id)).scalar()
+    batch = []
+    for i in range(existing, rows):
+        batch.append({
+            "name": f"Customer {i}", "email": f"customer{i}@example.com", "phone": "123456789",
+            "company": f"Company {i % 500}", "industry": ("Technology", "Finance", "Retail")[i % 3],
+            "location": "Shanghai, China", "tags": "VIP", "technical_evaluator": "Mike Lee",
+            "address": "123 Main St, City, Country"
+        })
+        if len(batch) == 10000:
+            db.session.execute(insert(Customer), batch)
+            batch = []
+    if batch:
+        db.session.execute(insert(Customer), batch)
+    db.session.commit()
+
+def best_of(repeat, func):
+    timings = []
+    for _ in range(repeat):
+        db.session.expunge_all()
+        started = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - started)
+    return min(timings)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=100000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    stdlib_json = DefaultJSONProvider(app)
+    with app.app_context():
+        seed(args.rows)
+        paths = {
+            "legacy (ORM objects + stdlib json)": lambda: stdlib_json.dumps(legacy_customers()),
+            "serializer (Core rows + FastJSONProvider)": lambda: app.json.dumps(customer_serializer.all()),
+        }
+        results = {name: best_of(args.repeat, func) for name, func in paths.items()}
+
+    baseline = results["legacy (ORM objects + stdlib json)"]
+    print(f"{args.rows} customers, best of {args.repeat}")
+    for name, seconds in results.items():
+        print(f"  {name:<44} {seconds * 1000:9.1f} ms  {baseline / seconds:5.2f}x")
+
+if __name__ == "__main__":
+    main()
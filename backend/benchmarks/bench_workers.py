@@ -0,0 +1,170 @@
+"""
+Load-tests gunicorn with sync workers against gevent workers (gunicorn.conf.py) on a mix of
+I/O-bound read endpoints, at several client concurrencies.
+
+    cd backend
+    DATABASE_URL=sqlite:////tmp/bench.db python benchmarks/synthetic_data.py --profile small --reset
+    DATABASE_URL=sqlite:////tmp/bench.db python benchmarks/bench_workers.py --workers 2 --db-latency-ms 5
+
+Each SQL statement waits --db-latency-ms (see latency_app.py) to stand in for the network round
+trip to MySQL; against a real MySQL DATABASE_URL pass --db-latency-ms 0.
+"""
+import argparse
+import json
+import os
+import random
+import re
+import socket
+import subprocess
+import sys
+import threading
+import time
+from datetime import datetime, timezone
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from app import app
+from bench_endpoints import SCENARIOS, RESULTS_FOLDER, HTTPTransport, RSSSampler, percentile, id_ranges, git_revision
+
+BACKEND = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+DEFAULT_MIX = r"^(customers\.(page|detail|filter_tag)|interactions\.by_customer|projects\.(detail|funding)|tasks\.by_project|health\.db)$"
+
+class ProcessTreeRSS(RSSSampler):
+    """RSS of the gunicorn master plus all of its workers, in MiB."""
+
+    def rss(self):
+        pids = [self.pid]
+        try:
+            for task in os.listdir(f"/proc/{self.pid}/task"):
+                with open(f"/proc/{self.pid}/task/{task}/children") as children:
+                    pids.extend(int(pid) for pid in children.read().split())
+        except OSError:
+            return None
+        total = 0
+        for pid in pids:
+            try:
+                with open(f"/proc/{pid}/status") as status:
+                    total += next(int(line.split()[1]) for line in status if line.startswith("VmRSS:"))
+            except (OSError, StopIteration):
+                pass
+        return total / 1024
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+def start_server(worker_class, workers, port, db_latency_ms):
+    env = dict(
+        os.environ, GUNICORN_WORKER_CLASS=worker_class, GUNICORN_WORKERS=str(workers),
+        GUNICORN_BIND=f"127.0.0.1:{port}", GUNICORN_ACCESS_LOG=os.devnull, GUNICORN_LOG_LEVEL="warning",
+        BENCH_DB_LATENCY_MS=str(db_latency_ms),
+    )
+    server = subprocess.Popen(
+        [sys.executable, "-m", "gunicorn", "--pythonpath", "benchmarks", "latency_app:app"], cwd=BACKEND, env=env
+    )
+    import requests
+    deadline = time.monotonic() + 60
+    while time.monotonic() < deadline:
+        if server.poll() is not None:
+            raise SystemExit(f"gunicorn ({worker_class}) exited with {server.returncode}")
+        try:
+            if requests.get(f"http://127.0.0.1:{port}/health/db", timeout=1).status_code == 200:
+                return server
+        except requests.RequestException:
+            pass
+        time.sleep(0.2)
+    server.terminate()
+    raise SystemExit(f"gunicorn ({worker_class}) did not become ready")
+
+def load(send, planned, concurrency, server_pid):
+    """Sends planned requests from concurrency client threads; returns latency and throughput stats."""
+    latencies, errors = [], 0
+    lock = threading.Lock()
+
+    def client(offset):
+        nonlocal errors
+        for method, path, kwargs in planned[offset::concurrency]:
+            started = time.perf_counter()
+            try:
+                status = send(method, path, kwargs)[0]
+            except Exception:
+                status = None
+            elapsed = time.perf_counter() - started
+            with lock:
+                latencies.append(elapsed)
+                errors += status != 200
+
+    threads = [threading.Thread(target=client, args=(n,)) for n in range(concurrency)]
+    with ProcessTreeRSS(server_pid) as sampler:
+        started = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        wall = time.perf_counter() - started
+    ordered = sorted(latencies)
+    return {
+        "requests": len(ordered),
+        "errors": errors,
+        "p50_ms": round(percentile(ordered, 0.50) * 1000, 3),
+        "p95_ms": round(percentile(ordered, 0.95) * 1000, 3),
+        "p99_ms": round(percentile(ordered, 0.99) * 1000, 3),
+        "throughput_rps": round(len(ordered) / wall, 2),
+        "peak_rss_mb": sampler.peak(),
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--worker-classes", default="sync,gevent")
+    parser.add_argument("--workers", type=int, default=2)
+    parser.add_argument("--concurrency", default="4,16,64", help="comma-separated client concurrencies")
+    parser.add_argument("--requests", type=int, default=400, help="requests per concurrency level")
+    parser.add_argument("--db-latency-ms", type=float, default=5.0)
+    parser.add_argument("--only", default=DEFAULT_MIX, help="regex over bench_endpoints scenario names")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", help="result file (default benchmarks/results/workers-<commit>.json)")
+    args = parser.parse_args()
+
+    with app.app_context():
+        ids = id_ranges()
+    mix = [s for s in SCENARIOS if re.search(args.only, s.name) and s.method == "GET" and not s.full]
+    rng = random.Random(args.seed)
+    planned = []
+    for _ in range(args.requests):
+        scenario = rng.choice(mix)
+        planned.append((scenario.method, *scenario.request(rng, ids)))
+    concurrencies = [int(c) for c in args.concurrency.split(",")]
+
+    commit, dirty = git_revision()
+    results = {
+        "commit": commit, "dirty": dirty, "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "cpus": os.cpu_count(), "workers": args.workers, "db_latency_ms": args.db_latency_ms,
+        "endpoints": [s.name for s in mix], "runs": {},
+    }
+    print(f"{args.workers} workers, {args.requests} requests per level, {args.db_latency_ms}ms per statement, "
+          f"{len(mix)} endpoints, {os.cpu_count()} CPUs")
+    print(f"  {'workers':<8} {'clients':>7} {'p50':>9} {'p95':>9} {'p99':>9} {'req/s':>8} {'rss MiB':>8} {'err':>4}")
+    for worker_class in args.worker_classes.split(","):
+        port = free_port()
+        server = start_server(worker_class, args.workers, port, args.db_latency_ms)
+        try:
+            send = HTTPTransport(f"http://127.0.0.1:{port}", {})
+            load(send, planned[:20], 4, server.pid)  # warm up every worker's pool and caches
+            for concurrency in concurrencies:
+                r = load(send, planned, concurrency, server.pid)
+                results["runs"][f"{worker_class}/{concurrency}"] = dict(r, worker_class=worker_class, concurrency=concurrency)
+                print(f"  {worker_class:<8} {concurrency:7d} {r['p50_ms']:7.1f}ms {r['p95_ms']:7.1f}ms "
+                      f"{r['p99_ms']:7.1f}ms {r['throughput_rps']:8.1f} {r['peak_rss_mb'] or '-':>8} {r['errors']:4d}")
+        finally:
+            server.terminate()
+            server.wait(timeout=30)
+
+    output = args.output or os.path.join(RESULTS_FOLDER, f"workers-{commit or 'unknown'}{'-dirty' if dirty else ''}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w") as f:
+        json.dump(results, f, indent=2, sort_keys=True)
+    print(f"Saved {output}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,22 @@
+"""
+WSGI entry point for bench_workers.py: the CRM app with BENCH_DB_LATENCY_MS of simulated
+network round trip added to every SQL statement, so a local SQLite database behaves like a
+MySQL server across the network. The wait is time.sleep, which gevent workers (like PyMySQL's
+socket reads) yield on and sync workers block on.
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from app import app
+
+DB_LATENCY = float(os.getenv("BENCH_DB_LATENCY_MS", 0)) / 1000
+
+if DB_LATENCY:
+    @event.listens_for(Engine, "before_cursor_execute")
+    def round_trip(conn, cursor, statement, parameters, context, executemany):
+        time.sleep(DB_LATENCY)
@@ -0,0 +1,213 @@
+import hashlib
+import logging
+from datetime import datetime, timezone
+from functools import wraps
+from itertools import chain
+from flask import request, make_response, Response
+from sqlalchemy import event, insert, select, update
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.orm import Session
+from config import db, REPORT_CACHE_URL, REPORT_CACHE_SIZE, REPORT_CACHE_TTL
+from models import TableVersion
+from utils import TTLCache
+
+logger = logging.getLogger(__name__)
+
+VERSIONS = TableVersion.__table__
+# Bookkeeping tables no response depends on; versioning them would only add lock contention
+UNVERSIONED_TABLES = {VERSIONS.name, "jobs"}
+
+def bump_table_versions(connection, table_names):
+    """Increments the write counter of each table, inside the caller's transaction."""
+    now = datetime.now(timezone.utc).replace(tzinfo=None, microsecond=0)
+    for name in sorted(table_names):
+        result = connection.execute(
+            update(VERSIONS).where(VERSIONS.c.table_name == name)
+            .values(version=VERSIONS.c.version + 1, updated_at=now)
+        )
+        if result.rowcount == 0:
+            connection.execute(insert(VERSIONS).values(table_name=name, version=1, updated_at=now))
+
+def record_table_writes(session, table_names):
+    """Queues a version bump and cache invalidation for writes made in session's transaction."""
+    session.info.setdefault("written_tables", set()).update(table_names)
+
+@event.listens_for(Session, "after_flush")
+def collect_written_tables(session, flush_context):
+    # Every ORM insert/update/delete marks its table as written; the versions are bumped once
+    # the transaction commits, so validators change exactly when committed data does, in every
+    # worker process. Core statements (e.g. the bulk customer import) must call record_table_writes themselves.
+    table_names = {
+        obj.__table__.name
+        for obj in chain(session.new, session.dirty, session.deleted)
+        if hasattr(obj, "__table__") and obj.__table__.name not in UNVERSIONED_TABLES
+    }
+    if table_names:
+        record_table_writes(session, table_names)
+
+@event.listens_for(Session, "after_commit")
+def bump_versions_after_commit(session):
+    # Bumped in a short transaction of its own rather than in the writer's: there, every writer
+    # to a table held the lock on its single table_versions row until commit, serialising them.
+    # The trade-off is a brief window after the commit where the old validators still describe
+    # the new data (a response built then carries the old ETag), and a worker dying inside that
+    # window leaves the version unbumped until the table's next write. The session cannot run
+    # SQL in after_commit, so this takes a second pooled connection.
+    written = session.info.pop("written_tables", None)
+    if not written:
+        return
+    try:
+        with db.engine.begin() as connection:
+            bump_table_versions(connection, written)
+    except DBAPIError:
+        # The write itself is committed; failing the request now would only hide that
+        logger.exception("Could not bump table versions for %s", ", ".join(sorted(written)))
+    report_cache.invalidate(written)
+
+@event.listens_for(Session, "after_rollback")
+def forget_writes_after_rollback(session):
+    session.info.pop("written_tables", None)
+
+def table_validators(table_names):
+    """Returns (strong ETag, Last-Modified) for the current request over the given tables."""
+    rows = db.session.execute(
+        VERSIONS.select().where(VERSIONS.c.table_name.in_(table_names))
+    ).all()
+    versions = {row.table_name: row.version for row in rows}
+    state = ",".join(f"{name}:{versions.get(name, 0)}" for name in sorted(table_names))
+    # The query string selects a different representation, so it is part of the tag
+    etag = hashlib.sha1(f"{request.full_path}|{state}".encode("utf-8")).hexdigest()
+    timestamps = [row.updated_at for row in rows if row.updated_at]
+    last_modified = max(timestamps).replace(tzinfo=timezone.utc) if timestamps else None
+    return etag, last_modified
+
+def conditional_get(*table_names):
+    """
+    Adds ETag and Last-Modified to a GET route whose response depends only on table_names,
+    and answers If-None-Match / If-Modified-Since with 304 before running the route.
+    """
+    def decorator(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            etag, last_modified = table_validators(table_names)
+
+            not_modified = (
+                request.if_none_match.contains(etag) if request.if_none_match
+                else bool(last_modified and request.if_modified_since and last_modified <= request.if_modified_since)
+            )
+            if not_modified:
+                response = Response(status=304)
+            else:
+                response = make_response(func(*args, **kwargs))
+                if response.status_code != 200:
+                    return response
+
+            response.set_etag(etag)
+            if last_modified:
+                response.last_modified = last_modified
+            return response
+        return wrapper
+    return decorator
+
+
+class MemoryCacheBackend:
+    """
+    Per-process LRU cache. Generations are the committed table_versions counters, so a write
+    committed by any worker changes the keys every other worker looks up.
+    """
+
+    def __init__(self, maxsize, ttl):
+        self.entries = TTLCache(maxsize, ttl)
+
+    def get(self, key):
+        value = self.entries.get(key)
+        return None if value is TTLCache.MISSING else value
+
+    def set(self, key, value):
+        self.entries.set(key, value)
+
+    def get_generations(self, names):
+        rows = db.session.execute(
+            select(VERSIONS.c.table_name, VERSIONS.c.version).where(VERSIONS.c.table_name.in_(names))
+        ).all()
+        versions = dict(rows)
+        return [versions.get(name, 0) for name in names]
+
+    def bump_generations(self, names):
+        # table_versions is bumped after every committed write (see bump_versions_after_commit)
+        pass
+
+class RedisCacheBackend:
+    """Cache shared by all workers through any Redis-protocol server."""
+
+    def __init__(self, url, ttl):
+        try:
+            import redis
+        except ImportError:
+            raise RuntimeError("REPORT_CACHE_URL points at Redis but the redis package is not installed")
+        self.client = redis.Redis.from_url(url)
+        self.ttl = ttl
+
+    def get(self, key):
+        return self.client.get(key)
+
+    def set(self, key, value):
+        self.client.set(key, value, ex=self.ttl)
+
+    def get_generations(self, names):
+        return [int(value or 0) for value in self.client.mget([f"crm:gen:{name}" for name in names])]
+
+    def bump_generations(self, names):
+        pipeline = self.client.pipeline()
+        for name in names:
+            pipeline.incr(f"crm:gen:{name}")
+        pipeline.execute()
+
+class ReportCache:
+    """
+    Caches report bodies keyed by route, query parameters and the generation of every
+    table the report reads. Committing a write bumps those generations, so later lookups
+    miss instead of serving stale aggregates; the orphaned entries age out of the LRU.
+    """
+
+    def __init__(self, backend):
+        self.backend = backend
+        self.hits = 0
+        self.misses = 0
+
+    def key(self, table_names):
+        generations = self.backend.get_generations(table_names)
+        state = ",".join(f"{name}:{generation}" for name, generation in zip(table_names, generations))
+        return f"crm:report:{request.endpoint}:{state}:{request.query_string.decode('utf-8')}"
+
+    def invalidate(self, table_names):
+        self.backend.bump_generations(sorted(table_names))
+
+    def cached(self, *table_names):
+        """Decorator serving a JSON GET route from the cache while table_names are unchanged."""
+        def decorator(func):
+            @wraps(func)
+            def wrapper(*args, **kwargs):
+                key = self.key(table_names)
+                body = self.backend.get(key)
+                if body is not None:
+                    self.hits += 1
+                    return Response(body, mimetype="application/json", headers={"X-Cache": "HIT"})
+
+                self.misses += 1
+                response = make_response(func(*args, **kwargs))
+                if response.status_code == 200:
+                    self.backend.set(key, response.get_data())
+                response.headers["X-Cache"] = "MISS"
+                return response
+            return wrapper
+        return decorator
+
+def create_cache_backend(url):
+    if url.startswith("memory://"):
+        return MemoryCacheBackend(REPORT_CACHE_SIZE, REPORT_CACHE_TTL)
+    if url.startswith(("redis://", "rediss://", "unix://")):
+        return RedisCacheBackend(url, REPORT_CACHE_TTL)
+    raise ValueError(f"Unsupported REPORT_CACHE_URL: {url}")
+
+report_cache = ReportCache(create_cache_backend(REPORT_CACHE_URL))
@@ -0,0 +1,95 @@
+import json
+import click
+from flask.cli import with_appcontext
+from sqlalchemy import select, text
+from config import db
+from pipeline import rebuild_pipeline, check_pipeline
+from jobs import HANDLERS, enqueue, work
+from models import (
+    Customer, CustomerTag, CustomerInteraction, SalesOpportunity, Project,
+    Task, UpdateLog, SupportRequest
+)
+
+# The filters each blueprint issues on its hot paths, with representative values
+INDEXED_QUERIES = [
+    ("customers", "industry filter", select(Customer.id).where(Customer.industry == "Technology")),
+    ("customers", "location filter", select(Customer.id).where(Customer.location == "Shanghai")),
+    ("customers", "tag filter", select(CustomerTag.customer_id).where(CustomerTag.tag == "VIP")),
+    ("interactions", "by customer", select(CustomerInteraction.id).where(CustomerInteraction.customer_id == 1)),
+    ("sales_opportunity", "by customer", select(SalesOpportunity.id).where(SalesOpportunity.customer_id == 1)),
+    ("reports", "sales_summary by owner and date",
+     select(SalesOpportunity.id).where(SalesOpportunity.owner == 1, SalesOpportunity.created_at >= "2025-01-01")),
+    ("projects", "by customer", select(Project.id).where(Project.customer_id == 1)),
+    ("tasks", "by project", select(Task.id).where(Task.project_id == 1)),
+    ("tasks", "by project and status", select(Task.id).where(Task.project_id == 1, Task.status == "Pending")),
+    ("tasks", "by assignee", select(Task.id).where(Task.assigned_to == "alice@example.com")),
+    ("update_logs", "by project", select(UpdateLog.id).where(UpdateLog.project_id == 1)),
+    ("support_requests", "by project", select(SupportRequest.id).where(SupportRequest.project_id == 1)),
+]
+
+def explain_index(sql):
+    """Runs EXPLAIN for sql and returns (index used or usable, plan summary)."""
+    dialect = db.engine.dialect.name
+    if dialect == "sqlite":
+        plan = [row.detail for row in db.session.execute(text(f"EXPLAIN QUERY PLAN {sql}"))]
+        return any("USING" in step and "INDEX" in step for step in plan), "; ".join(plan)
+
+    rows = db.session.execute(text(f"EXPLAIN {sql}")).mappings().all()
+    chosen = [row["key"] for row in rows if row.get("key")]
+    possible = [row["possible_keys"] for row in rows if row.get("possible_keys")]
+    if chosen:
+        return True, f"key={','.join(chosen)}"
+    # On near-empty tables MySQL may prefer a scan even though an index applies
+    return bool(possible), f"full scan; possible_keys={','.join(possible) or 'none'}"
+
+@click.command("check-indexes")
+@with_appcontext
+def check_indexes():
+    """EXPLAIN each blueprint's hot filters and fail if any of them cannot use an index."""
+    failures = 0
+    for blueprint, description, statement in INDEXED_QUERIES:
+        sql = statement.compile(db.engine, compile_kwargs={"literal_binds": True})
+        indexed, plan = explain_index(str(sql))
+        failures += not indexed
+        click.echo(f"{'ok  ' if indexed else 'MISS'} {blueprint:<18} {description:<32} {plan}")
+    if failures:
+        raise click.ClickException(f"{failures} filter(s) cannot use an index")
+
+@click.command("rebuild-pipeline")
+@with_appcontext
+def rebuild_pipeline_command():
+    """Recompute the sales pipeline rollup from sales_opportunity (pause sales writes while it runs)."""
+    buckets = rebuild_pipeline()
+    click.echo(f"Rebuilt sales pipeline rollup: {buckets} bucket(s)")
+
+@click.command("check-pipeline")
+@with_appcontext
+def check_pipeline_command():
+    """Compare the sales pipeline rollup with a full aggregation and fail on any drift."""
+    mismatches = check_pipeline()
+    for dimension, bucket, stored, expected in mismatches:
+        click.echo(f"MISS {dimension:<6} {bucket or '(none)':<24} stored={stored} expected={expected}")
+    if mismatches:
+        raise click.ClickException(f"{len(mismatches)} bucket(s) out of date; run `flask rebuild-pipeline`")
+    click.echo("Sales pipeline rollup is consistent")
+
+@click.command("run-jobs")
+@click.option("--once", is_flag=True, help="Exit once no job is due instead of polling forever.")
+@with_appcontext
+def run_jobs_command(once):
+    """Run queued background jobs (emails, upload processing, rollups). Start one per worker slot."""
+    processed = work(once=once)
+    click.echo(f"Processed {processed} job(s)")
+
+@click.command("enqueue-job")
+@click.argument("name")
+@click.option("--payload", default="{}", help="JSON object of keyword arguments for the handler.")
+@click.option("--delay", default=0, help="Seconds before the job becomes due.")
+@with_appcontext
+def enqueue_job_command(name, payload, delay):
+    """Queue a job by name, e.g. from cron: flask enqueue-job reconcile_pipeline"""
+    if name not in HANDLERS:
+        raise click.ClickException(f"Unknown job {name!r}; known jobs: {', '.join(sorted(HANDLERS))}")
+    queued = enqueue(name, delay=delay, **json.loads(payload))
+    db.session.commit()
+    click.echo(f"Queued job {queued.id} ({name})")
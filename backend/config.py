@@ -1,6 +1,7 @@
 import os
 from dotenv import load_dotenv
 from flask_sqlalchemy import SQLAlchemy
+from db_pool import InstrumentedQueuePool
 
 # Load environment variables from .env
 load_dotenv()
@@ -11,8 +12,78 @@ DB_USER = os.getenv("DB_USER")
 DB_PASSWORD = os.getenv("DB_PASSWORD")
 DB_NAME = os.getenv("DB_NAME")
 
-DATABASE_URL = f"mysql+mysqlconnector://{DB_USER}:{DB_PASSWORD}@{DB_HOST}/{DB_NAME}"
+# PyMySQL is pure Python, so under gevent workers (gunicorn.conf.py) its socket waits yield to
+# other requests; mysql-connector's C extension would block the whole worker while a query runs.
+# DB_DRIVER=mysqlconnector switches back.
+DB_DRIVER = os.getenv("DB_DRIVER", "pymysql")
+
+# DATABASE_URL overrides the MySQL settings above, e.g. sqlite:///bench.db for local benchmarks
+DATABASE_URL = os.getenv("DATABASE_URL") or f"mysql+{DB_DRIVER}://{DB_USER}:{DB_PASSWORD}@{DB_HOST}/{DB_NAME}?charset=utf8mb4"
+
+# Connection pool, per worker process: size it so that
+# workers * (DB_POOL_SIZE + DB_MAX_OVERFLOW) stays below the server's max_connections.
+SQLALCHEMY_ENGINE_OPTIONS = {
+    "poolclass": InstrumentedQueuePool,
+    "pool_size": int(os.getenv("DB_POOL_SIZE", 10)),
+    "max_overflow": int(os.getenv("DB_MAX_OVERFLOW", 20)),
+    "pool_timeout": int(os.getenv("DB_POOL_TIMEOUT", 30)),
+    # Recycle before MySQL/RDS drops idle connections (wait_timeout)
+    "pool_recycle": int(os.getenv("DB_POOL_RECYCLE", 1800)),
+    "pool_pre_ping": os.getenv("DB_POOL_PRE_PING", "true").lower() == "true",
+}
 
 SECRET_KEY = os.getenv("SECRET_KEY")
 
+# Authorization: role lookups are cached per worker process for USER_CACHE_TTL seconds.
+# Set TRUST_JWT_ROLE_CLAIM=true to authorize from the token's role claim without a lookup.
+USER_CACHE_SIZE = int(os.getenv("USER_CACHE_SIZE", 10000))
+USER_CACHE_TTL = int(os.getenv("USER_CACHE_TTL", 60))
+TRUST_JWT_ROLE_CLAIM = os.getenv("TRUST_JWT_ROLE_CLAIM", "false").lower() == "true"
+
+# Report response cache: "memory://" (per worker process) or a Redis-compatible URL
+# such as redis://localhost:6379/0, which shares entries and invalidations across workers.
+REPORT_CACHE_URL = os.getenv("REPORT_CACHE_URL", "memory://")
+REPORT_CACHE_SIZE = int(os.getenv("REPORT_CACHE_SIZE", 1024))
+REPORT_CACHE_TTL = int(os.getenv("REPORT_CACHE_TTL", 300))
+
+# Interaction attachments are stored content-addressed under UPLOAD_FOLDER/objects.
+# MAX_UPLOAD_SIZE (bytes) is enforced while the upload streams in; unfinished resumable
+# uploads are discarded after UPLOAD_SESSION_TTL seconds without a new chunk.
+UPLOAD_FOLDER = os.getenv("UPLOAD_FOLDER", "uploads")
+MAX_UPLOAD_SIZE = int(os.getenv("MAX_UPLOAD_SIZE", 100 * 1024 * 1024))
+UPLOAD_SESSION_TTL = int(os.getenv("UPLOAD_SESSION_TTL", 24 * 3600))
+# Behind nginx, set to an internal location aliased to UPLOAD_FOLDER (e.g. "/_uploads/") so
+# attachment downloads are answered with X-Accel-Redirect and served by the proxy.
+ATTACHMENT_ACCEL_REDIRECT = os.getenv("ATTACHMENT_ACCEL_REDIRECT")
+
+# Background jobs (jobs.py): idle workers poll every JOB_POLL_INTERVAL seconds, and
+# finished jobs are deleted after JOB_RETENTION_DAYS.
+JOB_POLL_INTERVAL = float(os.getenv("JOB_POLL_INTERVAL", 1.0))
+JOB_RETENTION_DAYS = int(os.getenv("JOB_RETENTION_DAYS", 7))
+
+# Notification email via Flask-Mail; without MAIL_SERVER emails are only logged.
+MAIL_SERVER = os.getenv("MAIL_SERVER")
+MAIL_PORT = int(os.getenv("MAIL_PORT", 587))
+MAIL_USE_TLS = os.getenv("MAIL_USE_TLS", "true").lower() == "true"
+MAIL_USERNAME = os.getenv("MAIL_USERNAME")
+MAIL_PASSWORD = os.getenv("MAIL_PASSWORD")
+MAIL_DEFAULT_SENDER = os.getenv("MAIL_DEFAULT_SENDER", MAIL_USERNAME)
+
+# Command that virus-scans an uploaded file given as its last argument, exiting 0 when clean
+# and 1 when infected, e.g. "clamdscan --no-summary --fdpass". Unset skips scanning.
+VIRUS_SCAN_COMMAND = os.getenv("VIRUS_SCAN_COMMAND")
+
+# Password hashing: BCRYPT_ROUNDS is the cost factor for new hashes (existing ones are
+# upgraded on the next successful login). Hashing runs on BCRYPT_POOL_SIZE threads per
+# worker process (0 = inline), and logins beyond BCRYPT_MAX_PENDING waiting get a 503.
+BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", 12))
+BCRYPT_POOL_SIZE = int(os.getenv("BCRYPT_POOL_SIZE", os.cpu_count() or 2))
+BCRYPT_MAX_PENDING = int(os.getenv("BCRYPT_MAX_PENDING", 64))
+
+# Per-request SQL instrumentation (query_stats.py): a request that runs the same statement
+# N_PLUS_ONE_THRESHOLD times or more is logged as a likely N+1 (and, under app.testing,
+# recorded for query_stats.assert_no_n_plus_one).
+QUERY_STATS_ENABLED = os.getenv("QUERY_STATS_ENABLED", "true").lower() == "true"
+N_PLUS_ONE_THRESHOLD = int(os.getenv("N_PLUS_ONE_THRESHOLD", 10))
+
 db = SQLAlchemy()
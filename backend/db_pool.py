@@ -0,0 +1,51 @@
+import os
+import time
+from threading import Lock
+from sqlalchemy.pool import QueuePool
+
+class InstrumentedQueuePool(QueuePool):
+    """QueuePool that records how long callers wait to check out a connection."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._stats_lock = Lock()
+        self.checkouts = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+
+    def _do_get(self):
+        started = time.perf_counter()
+        connection = super()._do_get()
+        waited = time.perf_counter() - started
+        with self._stats_lock:
+            self.checkouts += 1
+            self.total_wait += waited
+            self.max_wait = max(self.max_wait, waited)
+        return connection
+
+    def recreate(self):
+        # Keep the counters when the engine disposes and recreates its pool
+        pool = super().recreate()
+        pool.checkouts, pool.total_wait, pool.max_wait = self.checkouts, self.total_wait, self.max_wait
+        return pool
+
+def pool_status(engine):
+    """Returns the current utilization of engine's connection pool, for this worker process only."""
+    pool = engine.pool
+    status = {"pid": os.getpid(), "pool_class": type(pool).__name__}
+    if isinstance(pool, QueuePool):
+        status.update({
+            "pool_size": pool.size(),
+            "checked_out": pool.checkedout(),
+            "checked_in": pool.checkedin(),
+            # Negative until the pool has opened pool_size connections
+            "overflow": pool.overflow(),
+            "max_overflow": pool._max_overflow,
+        })
+    if isinstance(pool, InstrumentedQueuePool):
+        status.update({
+            "checkouts": pool.checkouts,
+            "avg_wait_ms": round(pool.total_wait / pool.checkouts * 1000, 3) if pool.checkouts else 0.0,
+            "max_wait_ms": round(pool.max_wait * 1000, 3),
+        })
+    return status
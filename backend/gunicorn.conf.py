@@ -0,0 +1,70 @@
+"""
+Production server settings; gunicorn reads this file from the working directory:
+
+    cd backend
+    gunicorn app:app
+
+Each setting can be overridden with the GUNICORN_* variable next to it. The defaults run
+gevent workers: a request waiting on MySQL, SMTP or the bcrypt pool yields to the others,
+so one worker per core serves many concurrent requests. GUNICORN_WORKER_CLASS=sync falls
+back to one request per worker at a time.
+"""
+import multiprocessing
+import os
+import shutil
+
+# The gevent worker monkey-patches itself after the fork; the master is never patched
+worker_class = os.getenv("GUNICORN_WORKER_CLASS", "gevent")
+
+# Samples left by a previous run would be summed into /metrics (see metrics.py). This has to
+# happen here rather than in on_starting, which gunicorn calls after preloading the app.
+if os.getenv("PROMETHEUS_MULTIPROC_DIR"):
+    shutil.rmtree(os.environ["PROMETHEUS_MULTIPROC_DIR"], ignore_errors=True)
+    os.makedirs(os.environ["PROMETHEUS_MULTIPROC_DIR"], exist_ok=True)
+
+bind = os.getenv("GUNICORN_BIND", "0.0.0.0:5000")
+# gevent workers are not limited by blocking I/O, so more workers than cores only adds memory;
+# sync workers need extra processes to overlap I/O
+workers = int(os.getenv(
+    "GUNICORN_WORKERS",
+    multiprocessing.cpu_count() if worker_class == "gevent" else multiprocessing.cpu_count() * 2 + 1
+))
+# Concurrent requests per gevent worker. Past DB_POOL_SIZE + DB_MAX_OVERFLOW of them wait for a
+# connection (DB_POOL_TIMEOUT), so raise the pool with this rather than letting requests queue there.
+worker_connections = int(os.getenv("GUNICORN_WORKER_CONNECTIONS", 100))
+threads = int(os.getenv("GUNICORN_THREADS", 1))
+
+# Behind a reverse proxy that reuses upstream connections; keep idle ones a little longer than its timeout
+keepalive = int(os.getenv("GUNICORN_KEEPALIVE", 5))
+timeout = int(os.getenv("GUNICORN_TIMEOUT", 60))
+graceful_timeout = int(os.getenv("GUNICORN_GRACEFUL_TIMEOUT", 30))
+
+# Recycle workers to bound slow leaks; the jitter keeps them from all restarting at once
+max_requests = int(os.getenv("GUNICORN_MAX_REQUESTS", 2000))
+max_requests_jitter = int(os.getenv("GUNICORN_MAX_REQUESTS_JITTER", 200))
+
+# Sync workers import the app once in the master and fork it: faster restarts and shared read-only
+# memory. A gevent worker must patch before the app (and ssl, threading, ...) is imported, which
+# only happens when each worker imports it itself, so preloading is off by default there.
+preload_app = os.getenv("GUNICORN_PRELOAD", "false" if worker_class == "gevent" else "true").lower() == "true"
+
+accesslog = os.getenv("GUNICORN_ACCESS_LOG", "-")
+errorlog = "-"
+loglevel = os.getenv("GUNICORN_LOG_LEVEL", "info")
+# Request time in microseconds (%(D)s) for latency analysis from the access log
+access_log_format = '%(h)s "%(r)s" %(s)s %(b)s %(D)sus "%(a)s"'
+
+def post_fork(server, worker):
+    # A preloaded app may have opened connections in the master; the child must not share them
+    if not server.cfg.preload_app:
+        return
+    from app import app
+    from config import db
+    with app.app_context():
+        db.engine.dispose(close=False)
+
+def child_exit(server, worker):
+    # Drops the exited worker's live gauges (in-flight requests, pool size, ...) from /metrics
+    if os.getenv("PROMETHEUS_MULTIPROC_DIR"):
+        from prometheus_client import multiprocess
+        multiprocess.mark_process_dead(worker.pid)
@@ -0,0 +1,125 @@
+import logging
+import os
+import shlex
+import subprocess
+from flask import current_app
+from sqlalchemy import select, or_
+from config import db, MAIL_SERVER, MAIL_DEFAULT_SENDER, VIRUS_SCAN_COMMAND, UPLOAD_FOLDER
+from models import User, Task, Project, CustomerInteraction
+from jobs import job
+from pipeline import check_pipeline, rebuild_pipeline
+
+try:
+    from PIL import Image
+except ImportError:  # thumbnails are skipped without Pillow
+    Image = None
+
+logger = logging.getLogger(__name__)
+
+THUMBNAIL_FOLDER = os.path.join(UPLOAD_FOLDER, "thumbnails")
+THUMBNAIL_SIZE = (256, 256)
+SCAN_TIMEOUT = 120
+
+def thumbnail_path(sha256):
+    return os.path.join(THUMBNAIL_FOLDER, sha256[:2], sha256 + ".png")
+
+# --- Notification emails ---
+
+@job("send_email", timeout=60)
+def send_email(to, subject, body):
+    if not MAIL_SERVER:
+        logger.info("email to %s not sent (MAIL_SERVER unset): %s", to, subject)
+        return
+    from flask_mail import Message
+    current_app.extensions["mail"].send(Message(subject, recipients=[to], body=body, sender=MAIL_DEFAULT_SENDER))
+
+@job("notify_task_assigned", timeout=60)
+def notify_task_assigned(task_id):
+    task = db.session.get(Task, task_id)
+    if task is None or not task.assigned_to:
+        return
+    # The frontend stores a user id in Task.assigned_to; older rows hold an email address
+    assignee = task.assigned_to
+    matches = [User.email == assignee]
+    if assignee.isdigit():
+        matches.append(User.id == int(assignee))
+    email = db.session.execute(select(User.email).where(or_(*matches))).scalar()
+    if not email:
+        logger.info("task %s assignee %r has no user email; notification skipped", task_id, assignee)
+        return
+    send_email(
+        email,
+        f"New task: {task.description}",
+        f"You have been assigned \"{task.description}\" on project #{task.project_id}, due {task.due_date}."
+    )
+
+@job("notify_funding_approved", timeout=60)
+def notify_funding_approved(project_id):
+    project = db.session.get(Project, project_id)
+    if project is None or not project.manager:
+        return
+    # Project.manager holds a name or an email address
+    email = db.session.execute(
+        select(User.email).where(or_(User.email == project.manager, User.name == project.manager))
+    ).scalar()
+    if email:
+        send_email(
+            email,
+            f"Funding {project.funding_status.lower()}: {project.project_name}",
+            f"Funding for \"{project.project_name}\" is now {project.funding_status} (budget {project.budget})."
+        )
+
+# --- Upload processing ---
+
+def scan_file(path):
+    """Returns "clean", "infected" or "skipped"; scanner errors raise so the job is retried."""
+    if not VIRUS_SCAN_COMMAND:
+        return "skipped"
+    result = subprocess.run(
+        shlex.split(VIRUS_SCAN_COMMAND) + [os.path.abspath(path)],
+        capture_output=True, text=True, timeout=SCAN_TIMEOUT
+    )
+    if result.returncode == 0:
+        return "clean"
+    if result.returncode == 1:
+        return "infected"
+    raise RuntimeError(f"Virus scan failed ({result.returncode}): {result.stderr.strip() or result.stdout.strip()}")
+
+def make_thumbnail(path, sha256):
+    target = thumbnail_path(sha256)
+    if Image is None or os.path.exists(target):
+        return
+    try:
+        with Image.open(path) as image:
+            image.thumbnail(THUMBNAIL_SIZE)
+            os.makedirs(os.path.dirname(target), exist_ok=True)
+            image.save(target + ".tmp", format="PNG")
+        os.replace(target + ".tmp", target)
+    except (OSError, Image.DecompressionBombError) as e:
+        logger.info("no thumbnail for %s: %s", sha256, e)
+
+@job("process_upload", timeout=600)
+def process_upload(interaction_id):
+    interaction = db.session.get(CustomerInteraction, interaction_id)
+    if interaction is None or not interaction.file_path or not interaction.file_sha256:
+        return
+    # Stored files are content-addressed, so an earlier verdict for the same bytes still holds
+    status = db.session.execute(
+        select(CustomerInteraction.file_scan_status).where(
+            CustomerInteraction.file_sha256 == interaction.file_sha256,
+            CustomerInteraction.file_scan_status.in_(["clean", "infected"])
+        ).limit(1)
+    ).scalar() or scan_file(interaction.file_path)
+    interaction.file_scan_status = status
+    if status != "infected" and (interaction.file_mime_type or "").startswith("image/"):
+        make_thumbnail(interaction.file_path, interaction.file_sha256)
+
+# --- Report rollups ---
+
+@job("reconcile_pipeline", timeout=1800, max_attempts=3)
+def reconcile_pipeline():
+    """Rebuilds the sales pipeline rollup if it has drifted from sales_opportunity."""
+    mismatches = check_pipeline()
+    if mismatches:
+        logger.warning("sales pipeline rollup drifted in %d bucket(s); rebuilding", len(mismatches))
+        rebuild_pipeline()
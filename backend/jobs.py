@@ -0,0 +1,146 @@
+import json
+import logging
+import os
+import random
+import socket
+import time
+from datetime import datetime, timedelta, timezone
+from sqlalchemy import select, update, or_, and_, delete
+from config import db, JOB_POLL_INTERVAL, JOB_RETENTION_DAYS
+from models import Job
+
+logger = logging.getLogger(__name__)
+
+HANDLERS = {}
+DEFAULT_TIMEOUT = 300
+BACKOFF_BASE = 10
+BACKOFF_MAX = 3600
+CLAIM_BATCH = 10
+
+def utcnow():
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+def job(name, timeout=DEFAULT_TIMEOUT, max_attempts=5):
+    """
+    Registers a handler for jobs called name. timeout is the visibility timeout: a job still
+    running after that long is assumed lost with its worker and is handed to another one.
+    """
+    def decorator(func):
+        HANDLERS[name] = (func, timeout, max_attempts)
+        return func
+    return decorator
+
+def enqueue(name, delay=0, **payload):
+    """
+    Adds a job to the current session. It becomes visible to workers only when the caller
+    commits, so a job is never run for a write that was rolled back.
+    """
+    now = utcnow()
+    max_attempts = HANDLERS[name][2] if name in HANDLERS else 5
+    queued = Job(
+        name=name, payload=json.dumps(payload), status="queued", attempts=0, max_attempts=max_attempts,
+        run_at=now + timedelta(seconds=delay), created_at=now
+    )
+    db.session.add(queued)
+    return queued
+
+def backoff(attempts):
+    """Seconds to wait before retry number attempts: exponential, capped, with jitter."""
+    delay = min(BACKOFF_MAX, BACKOFF_BASE * 2 ** (attempts - 1))
+    return delay * random.uniform(0.5, 1.0)
+
+def dead_letter_lapsed(now):
+    """Fails running jobs whose lease lapsed with no attempts left, e.g. ones that keep killing their worker."""
+    result = db.session.execute(
+        update(Job)
+        .where(Job.status == "running", Job.locked_until < now, Job.attempts >= Job.max_attempts)
+        .values(
+            status="failed", finished_at=now, locked_until=None,
+            last_error="Lease expired: the worker died or the job ran past its timeout"
+        )
+    )
+    db.session.commit()
+    if result.rowcount:
+        logger.warning("%d job(s) failed after their last attempt's lease expired", result.rowcount)
+
+def claim_job(worker_id):
+    """
+    Claims the next due job for worker_id, or returns None. The claim is a conditional UPDATE
+    that only one worker can win, so this needs no SELECT ... FOR UPDATE / SKIP LOCKED.
+    """
+    now = utcnow()
+    dead_letter_lapsed(now)
+    due = or_(
+        and_(Job.status == "queued", Job.run_at <= now),
+        and_(Job.status == "running", Job.locked_until < now, Job.attempts < Job.max_attempts),
+    )
+    candidates = db.session.execute(
+        select(Job.id, Job.name, Job.status).where(due).order_by(Job.run_at).limit(CLAIM_BATCH)
+    ).all()
+    for id, name, status in candidates:
+        timeout = HANDLERS[name][1] if name in HANDLERS else DEFAULT_TIMEOUT
+        claimed = db.session.execute(
+            update(Job)
+            .where(Job.id == id, Job.status == status, or_(Job.locked_until.is_(None), Job.locked_until < now))
+            .values(
+                status="running", attempts=Job.attempts + 1, locked_by=worker_id,
+                locked_until=now + timedelta(seconds=timeout)
+            )
+        ).rowcount
+        db.session.commit()
+        if claimed:
+            return db.session.get(Job, id)
+    return None
+
+def run_job(claimed):
+    """Runs a claimed job; success commits the handler's writes together with status=done."""
+    handler = HANDLERS.get(claimed.name)
+    try:
+        if handler is None:
+            raise LookupError(f"No handler registered for job {claimed.name!r}")
+        handler[0](**json.loads(claimed.payload))
+        claimed.status = "done"
+        claimed.finished_at = utcnow()
+        claimed.locked_until = None
+        claimed.last_error = None
+        db.session.commit()
+        return True
+    except Exception as e:
+        db.session.rollback()
+        retry = handler is not None and claimed.attempts < claimed.max_attempts
+        claimed.status = "queued" if retry else "failed"
+        claimed.last_error = f"{type(e).__name__}: {e}"[:2000]
+        claimed.locked_until = None
+        if retry:
+            claimed.run_at = utcnow() + timedelta(seconds=backoff(claimed.attempts))
+        else:
+            claimed.finished_at = utcnow()
+        db.session.commit()
+        logger.warning("job %s (%s) attempt %s failed: %s", claimed.id, claimed.name, claimed.attempts, e)
+        return False
+
+def purge_finished(days=JOB_RETENTION_DAYS):
+    """Deletes done jobs older than days; failed jobs are kept for inspection."""
+    cutoff = utcnow() - timedelta(days=days)
+    result = db.session.execute(delete(Job).where(Job.status == "done", Job.finished_at < cutoff))
+    db.session.commit()
+    return result.rowcount
+
+def work(once=False, poll_interval=JOB_POLL_INTERVAL, worker_id=None):
+    """Worker loop: runs due jobs until the queue is empty (once=True) or forever, polling when idle."""
+    worker_id = worker_id or f"{socket.gethostname()}:{os.getpid()}"
+    processed = 0
+    last_purge = 0
+    while True:
+        claimed = claim_job(worker_id)
+        if claimed is not None:
+            run_job(claimed)
+            processed += 1
+            continue
+        if once:
+            return processed
+        if time.monotonic() - last_purge > 3600:
+            purge_finished()
+            last_purge = time.monotonic()
+        db.session.remove()
+        time.sleep(poll_interval)
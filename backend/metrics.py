@@ -0,0 +1,124 @@
+import os
+import time
+from threading import Lock
+from flask import Response, g, request
+from config import db
+from prometheus_client import (
+    CollectorRegistry, Counter, Gauge, Histogram, REGISTRY, generate_latest, multiprocess, CONTENT_TYPE_LATEST
+)
+from db_pool import pool_status
+from caching import report_cache
+from passwords import hashing_pool
+
+# With PROMETHEUS_MULTIPROC_DIR set (required under gunicorn), every worker writes its samples
+# to files in that directory and /metrics on any worker reports the sum across all of them.
+# The directory must be emptied before the server starts.
+MULTIPROCESS = bool(os.getenv("PROMETHEUS_MULTIPROC_DIR"))
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+REQUEST_LATENCY = Histogram(
+    "crm_http_request_duration_seconds", "Time spent handling HTTP requests.",
+    ["blueprint", "endpoint", "method", "status"], buckets=LATENCY_BUCKETS
+)
+IN_FLIGHT = Gauge(
+    "crm_http_requests_in_flight", "HTTP requests currently being handled.", multiprocess_mode="livesum"
+)
+# Per-worker state sampled after each request; "livesum" drops workers that have exited
+POOL_SIZE = Gauge("crm_db_pool_size", "Configured database connections.", multiprocess_mode="livesum")
+POOL_CHECKED_OUT = Gauge(
+    "crm_db_pool_checked_out", "Database connections in use.", multiprocess_mode="livesum"
+)
+POOL_OVERFLOW = Gauge(
+    "crm_db_pool_overflow", "Connections opened beyond the pool size.", multiprocess_mode="livesum"
+)
+POOL_CHECKOUTS = Counter("crm_db_pool_checkouts", "Database connection checkouts.")
+POOL_WAIT = Counter("crm_db_pool_wait_seconds", "Time spent waiting for a database connection.")
+REPORT_CACHE = Counter("crm_report_cache_requests", "Report cache lookups.", ["result"])
+BCRYPT_PENDING = Gauge(
+    "crm_bcrypt_pending", "Password hashes running or waiting for a hashing thread.", multiprocess_mode="livesum"
+)
+BCRYPT_THREADS = Gauge("crm_bcrypt_threads", "Password hashing threads.", multiprocess_mode="livesum")
+
+class CumulativeSync:
+    """
+    Turns a per-process running total (pool checkouts, cache hits, ...) into counter increments,
+    since multiprocess counters can only be incremented, not set.
+    """
+
+    def __init__(self):
+        self.seen = {}
+        self.lock = Lock()
+
+    def __call__(self, counter, total):
+        with self.lock:
+            # A total lower than last time means the source was reset; count it from zero
+            delta = total - self.seen.get(counter, 0)
+            if delta < 0:
+                delta = total
+            if delta:
+                counter.inc(delta)
+            self.seen[counter] = total
+
+sync_total = CumulativeSync()
+
+def sample_process_metrics():
+    """Copies this worker's pool, cache and hashing state into the metrics."""
+    status = pool_status(db.engine)
+    if "pool_size" in status:
+        POOL_SIZE.set(status["pool_size"])
+        POOL_CHECKED_OUT.set(status["checked_out"])
+        POOL_OVERFLOW.set(max(status["overflow"], 0))
+    pool = db.engine.pool
+    if hasattr(pool, "checkouts"):
+        sync_total(POOL_CHECKOUTS, pool.checkouts)
+        sync_total(POOL_WAIT, pool.total_wait)
+    sync_total(REPORT_CACHE.labels("hit"), report_cache.hits)
+    sync_total(REPORT_CACHE.labels("miss"), report_cache.misses)
+    BCRYPT_PENDING.set(hashing_pool.pending)
+    BCRYPT_THREADS.set(max(hashing_pool.size, 0))
+
+def start_timer():
+    g.metrics_started = time.perf_counter()
+    # A scrape would otherwise always report itself as in flight
+    if request.endpoint != "metrics":
+        g.metrics_in_flight = True
+        IN_FLIGHT.inc()
+
+def note_status(response):
+    g.metrics_status = response.status_code
+    return response
+
+def end_request(exc):
+    # teardown_request runs for every request, including those that raised: after_request
+    # does not, which would drop 500s from the histogram and leak the in-flight gauge
+    started = g.pop("metrics_started", None)
+    status = 500 if exc is not None else g.pop("metrics_status", 500)
+    if started is not None:
+        REQUEST_LATENCY.labels(
+            request.blueprint or "", request.endpoint or "(unmatched)", request.method, str(status)
+        ).observe(time.perf_counter() - started)
+    if g.pop("metrics_in_flight", False):
+        IN_FLIGHT.dec()
+    sample_process_metrics()
+
+def metrics_view():
+    """Prometheus text exposition of the metrics above, across all workers when MULTIPROCESS."""
+    sample_process_metrics()
+    if MULTIPROCESS:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    return Response(generate_latest(registry), mimetype=CONTENT_TYPE_LATEST)
+
+def mark_process_dead(pid):
+    """For gunicorn's child_exit hook: drops an exited worker's live gauges."""
+    if MULTIPROCESS:
+        multiprocess.mark_process_dead(pid)
+
+def init_metrics(app):
+    app.before_request(start_timer)
+    app.after_request(note_status)
+    app.teardown_request(end_request)
+    app.add_url_rule("/metrics", "metrics", metrics_view)
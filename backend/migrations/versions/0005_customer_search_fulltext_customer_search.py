@@ -0,0 +1,28 @@
+"""fulltext customer search
+
+Revision ID: 0005_customer_search
+Revises: 0004_sales_pipeline_rollup
+Create Date: 2026-10-18 17:05:12.640117
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '0005_customer_search'
+down_revision = '0004_sales_pipeline_rollup'
+branch_labels = None
+depends_on = None
+
+SEARCH_COLUMNS = ['name', 'company', 'email', 'tags', 'industry', 'location']
+
+
+def upgrade():
+    # FULLTEXT is MySQL-only; elsewhere /customers/search uses the in-process index
+    if op.get_bind().dialect.name in ('mysql', 'mariadb'):
+        op.create_index('ft_customers_search', 'customers', SEARCH_COLUMNS, mysql_prefix='FULLTEXT')
+
+
+def downgrade():
+    if op.get_bind().dialect.name in ('mysql', 'mariadb'):
+        op.drop_index('ft_customers_search', table_name='customers')
@@ -1,9 +1,6 @@
 from datetime import datetime, timezone
-from flask_bcrypt import Bcrypt
 from config import db
-from werkzeug.security import generate_password_hash, check_password_hash
-
-bcrypt = Bcrypt()
+from passwords import hash_password, verify_password, needs_rehash
 
 class User(db.Model):
     __tablename__ = "users"
@@ -15,12 +12,16 @@ class User(db.Model):
     role = db.Column(db.Enum('Admin', 'Sales', 'Project Manager'), nullable=False)
 
     def set_password(self, password):
-        """Hashes the password before storing it."""
-        self.password = bcrypt.generate_password_hash(password).decode('utf-8')
+        """Hashes the password (on the bcrypt thread pool) before storing it."""
+        self.password = hash_password(password)
 
     def check_password(self, password):
-        """Verifies hashed password."""
-        return bcrypt.check_password_hash(self.password, password)
+        """Verifies hashed password, re-hashing it if it was made with a different cost factor."""
+        if not verify_password(self.password, password):
+            return False
+        if needs_rehash(self.password):
+            self.set_password(password)
+        return True
 
     def __repr__(self):
         return f"<User {self.name} - {self.role}>"
@@ -28,23 +29,44 @@ class User(db.Model):
 
 class Customer(db.Model):
     __tablename__ = "customers"
+    __table_args__ = (
+        # Backs /customers/search on MySQL; other databases use the in-process index in search.py
+        db.Index(
+            "ft_customers_search", "name", "company", "email", "tags", "industry", "location",
+            mysql_prefix="FULLTEXT"
+        ).ddl_if(dialect=("mysql", "mariadb")),
+    )
 
     id = db.Column(db.Integer, primary_key=True, autoincrement=True)
     name = db.Column(db.String(255), nullable=False)
     email = db.Column(db.String(255), unique=True, nullable=False)
     phone = db.Column(db.String(50))
     company = db.Column(db.String(255))
-    industry = db.Column(db.String(255))
+    industry = db.Column(db.String(255), index=True)
     created_at = db.Column(db.TIMESTAMP, server_default=db.func.current_timestamp())
     address = db.Column(db.String(255))
-    location = db.Column(db.String(255)) 
+    location = db.Column(db.String(255), index=True)
     tags = db.Column(db.String(255))
     technical_evaluator = db.Column(db.String(100))
     
     interactions = db.relationship("CustomerInteraction", backref="customer", lazy=True, cascade="all, delete")
+    # One lowercased row per tag in `tags`, kept in step by tags.py; filter on these rather than LIKE on `tags`
+    tag_rows = db.relationship("CustomerTag", lazy=True, cascade="all, delete-orphan")
+
+class CustomerTag(db.Model):
+    __tablename__ = "customer_tags"
+    __table_args__ = (
+        db.Index("ix_customer_tags_tag_customer_id", "tag", "customer_id"),
+    )
+
+    customer_id = db.Column(db.Integer, db.ForeignKey("customers.id", ondelete="CASCADE"), primary_key=True)
+    tag = db.Column(db.String(255), primary_key=True)
 
 class CustomerInteraction(db.Model):
     __tablename__ = "customer_interactions"
+    __table_args__ = (
+        db.Index("ix_customer_interactions_customer_id_interaction_date", "customer_id", "interaction_date"),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     customer_id = db.Column(db.Integer, db.ForeignKey("customers.id"), nullable=False)
@@ -52,9 +74,18 @@ class CustomerInteraction(db.Model):
     interaction_date = db.Column(db.TIMESTAMP, server_default=db.func.current_timestamp())
     details = db.Column(db.Text)
     file_path = db.Column(db.String(255)) 
+    file_name = db.Column(db.String(255))
+    file_sha256 = db.Column(db.String(64), index=True)
+    file_size = db.Column(db.BigInteger)
+    file_mime_type = db.Column(db.String(255))
+    file_scan_status = db.Column(db.String(20))  # pending, clean, infected or skipped; set by job_handlers.py
 
 class SalesOpportunity(db.Model):
     __tablename__ = "sales_opportunity"
+    __table_args__ = (
+        db.Index("ix_sales_opportunity_customer_id_created_at", "customer_id", "created_at"),
+        db.Index("ix_sales_opportunity_owner_created_at", "owner", "created_at"),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     customer_id = db.Column(db.Integer, db.ForeignKey("customers.id"), nullable=False)  
@@ -68,7 +99,7 @@ class Project(db.Model):
     __tablename__ = "projects"
 
     id = db.Column(db.Integer, primary_key=True)
-    customer_id = db.Column(db.Integer, db.ForeignKey("customers.id"), nullable=False)
+    customer_id = db.Column(db.Integer, db.ForeignKey("customers.id"), nullable=False, index=True)
     project_name = db.Column(db.String(200), nullable=False)
     budget = db.Column(db.Float)
     phase = db.Column(db.String(100))
@@ -82,6 +113,9 @@ class Project(db.Model):
 
 class Task(db.Model):
     __tablename__ = "tasks"
+    __table_args__ = (
+        db.Index("ix_tasks_project_id_status", "project_id", "status"),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     project_id = db.Column(
@@ -91,7 +125,7 @@ class Task(db.Model):
     )
     description = db.Column(db.String(255), nullable=False) 
     due_date = db.Column(db.Date, nullable=False)  
-    assigned_to = db.Column(db.String, db.ForeignKey("users.email"))  
+    assigned_to = db.Column(db.String, db.ForeignKey("users.email"), index=True)
     status = db.Column(db.String(50), default="Pending")  # Task status: Pending, In Progress, Completed
 
     project = db.relationship(
@@ -113,6 +147,9 @@ class CommunicationLog(db.Model):
 
 class SupportRequest(db.Model):
     __tablename__ = 'support_requests'
+    __table_args__ = (
+        db.Index('ix_support_requests_project_id_status', 'project_id', 'status'),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     project_id = db.Column(db.Integer, db.ForeignKey('projects.id'), nullable=False)
@@ -125,6 +162,9 @@ class SupportRequest(db.Model):
     
 class UpdateLog(db.Model):
     __tablename__ = 'update_logs'
+    __table_args__ = (
+        db.Index('ix_update_logs_project_id_timestamp', 'project_id', 'timestamp'),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     project_id = db.Column(db.Integer, db.ForeignKey('projects.id'), nullable=False)
@@ -134,3 +174,43 @@ class UpdateLog(db.Model):
     comment = db.Column(db.Text)
 
     project = db.relationship('Project', back_populates='update_logs')
+
+
+# Per-table write counter backing the ETag / Last-Modified validators (see caching.py)
+class TableVersion(db.Model):
+    __tablename__ = "table_versions"
+
+    table_name = db.Column(db.String(64), primary_key=True)
+    version = db.Column(db.BigInteger, nullable=False, default=0)
+    updated_at = db.Column(db.DateTime, nullable=False)
+
+
+# Sales pipeline totals per sales stage / owner / creation month, kept current by pipeline.py
+class SalesPipelineRollup(db.Model):
+    __tablename__ = "sales_pipeline_rollup"
+
+    dimension = db.Column(db.String(20), primary_key=True)  # "stage", "owner" or "month"
+    bucket = db.Column(db.String(100), primary_key=True)  # "" stands for NULL
+    opportunities = db.Column(db.Integer, nullable=False, default=0)
+    revenue = db.Column(db.Float, nullable=False, default=0)
+
+
+# Background work queued by the request path and run by `flask run-jobs` (see jobs.py)
+class Job(db.Model):
+    __tablename__ = "jobs"
+    __table_args__ = (
+        db.Index("ix_jobs_status_run_at", "status", "run_at"),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    name = db.Column(db.String(100), nullable=False)
+    payload = db.Column(db.Text, nullable=False, default="{}")  # JSON keyword arguments for the handler
+    status = db.Column(db.String(20), nullable=False, default="queued")  # queued, running, done or failed
+    attempts = db.Column(db.Integer, nullable=False, default=0)
+    max_attempts = db.Column(db.Integer, nullable=False, default=5)
+    run_at = db.Column(db.DateTime, nullable=False)
+    locked_until = db.Column(db.DateTime)  # a running job whose lock has lapsed is picked up again
+    locked_by = db.Column(db.String(100))
+    last_error = db.Column(db.Text)
+    created_at = db.Column(db.DateTime, nullable=False)
+    finished_at = db.Column(db.DateTime)
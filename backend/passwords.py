@@ -0,0 +1,79 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+from threading import Lock
+from flask_bcrypt import Bcrypt
+from config import BCRYPT_ROUNDS, BCRYPT_POOL_SIZE, BCRYPT_MAX_PENDING
+
+bcrypt = Bcrypt()
+
+class HasherBusy(Exception):
+    """More password operations are waiting than BCRYPT_MAX_PENDING; routes answer 503."""
+
+def gevent_patched():
+    try:
+        from gevent import monkey
+    except ImportError:
+        return False
+    return monkey.is_module_patched("threading")
+
+class HashingPool:
+    """
+    Runs bcrypt on a fixed number of native threads. bcrypt releases the GIL, so these run
+    in parallel with request handling; under gevent the calling greenlet yields to the hub
+    while it waits instead of blocking every other request on the worker.
+    """
+
+    def __init__(self, size, max_pending):
+        self.size = size
+        self.max_pending = max_pending
+        self.pending = 0
+        self.lock = Lock()
+        self.pool = None
+        self.pid = None
+
+    def executor(self):
+        # Created lazily and again after fork, so preloaded gunicorn workers get their own threads
+        if self.pid != os.getpid():
+            if gevent_patched():
+                from gevent.threadpool import ThreadPool
+                self.pool = ThreadPool(self.size)
+            else:
+                self.pool = ThreadPoolExecutor(max_workers=self.size, thread_name_prefix="bcrypt")
+            self.pid = os.getpid()
+        return self.pool
+
+    def run(self, func, *args):
+        if self.size <= 0:
+            return func(*args)
+        with self.lock:
+            if self.pending >= self.max_pending:
+                raise HasherBusy("Too many concurrent password hashes")
+            self.pending += 1
+        try:
+            pool = self.executor()
+            if isinstance(pool, ThreadPoolExecutor):
+                return pool.submit(func, *args).result()
+            return pool.apply(func, args)
+        finally:
+            with self.lock:
+                self.pending -= 1
+
+hashing_pool = HashingPool(BCRYPT_POOL_SIZE, BCRYPT_MAX_PENDING)
+
+def hash_password(password, rounds=None):
+    return hashing_pool.run(
+        lambda: bcrypt.generate_password_hash(password, rounds or BCRYPT_ROUNDS).decode("utf-8")
+    )
+
+def verify_password(password_hash, password):
+    return hashing_pool.run(bcrypt.check_password_hash, password_hash, password)
+
+def hash_rounds(password_hash):
+    """Cost factor of a bcrypt hash ("$2b$12$..." -> 12), or None if it is not one."""
+    try:
+        return int(password_hash.split("$")[2])
+    except (AttributeError, IndexError, ValueError):
+        return None
+
+def needs_rehash(password_hash):
+    return hash_rounds(password_hash) != BCRYPT_ROUNDS
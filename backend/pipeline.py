@@ -0,0 +1,163 @@
+from datetime import datetime
+from sqlalchemy import event, inspect, select, insert, delete, func
+from sqlalchemy.dialects.mysql import insert as mysql_insert
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from config import db
+from models import SalesOpportunity, SalesPipelineRollup
+from caching import record_table_writes
+
+ROLLUP = SalesPipelineRollup.__table__
+TRACKED_ATTRIBUTES = ("sales_stage", "owner", "created_at", "revenue")
+
+def bucket_value(value):
+    return "" if value is None else str(value)
+
+def amount(revenue):
+    # Request bodies may still hold the value as sent (e.g. "1200.50") until the row is reloaded
+    return float(revenue) if revenue is not None else 0.0
+
+def month_of(created_at):
+    return created_at.strftime("%Y-%m") if created_at else None
+
+def buckets(stage, owner, created_at):
+    return {
+        ("stage", bucket_value(stage)),
+        ("owner", bucket_value(owner)),
+        ("month", bucket_value(month_of(created_at))),
+    }
+
+def apply_delta(connection, dimension, bucket, opportunities, revenue):
+    # One atomic upsert: with UPDATE-then-INSERT, two writers opening the same new bucket
+    # would both insert and the second would fail on the primary key, rolling back its sale
+    values = {"dimension": dimension, "bucket": bucket, "opportunities": opportunities, "revenue": revenue}
+    dialect = connection.dialect.name
+    if dialect in ("mysql", "mariadb"):
+        statement = mysql_insert(ROLLUP).values(values)
+        statement = statement.on_duplicate_key_update(
+            opportunities=ROLLUP.c.opportunities + statement.inserted.opportunities,
+            revenue=ROLLUP.c.revenue + statement.inserted.revenue,
+        )
+    elif dialect in ("sqlite", "postgresql"):
+        insert_for = sqlite_insert if dialect == "sqlite" else postgresql_insert
+        statement = insert_for(ROLLUP).values(values)
+        statement = statement.on_conflict_do_update(
+            index_elements=[ROLLUP.c.dimension, ROLLUP.c.bucket],
+            set_={
+                "opportunities": ROLLUP.c.opportunities + statement.excluded.opportunities,
+                "revenue": ROLLUP.c.revenue + statement.excluded.revenue,
+            },
+        )
+    else:
+        raise NotImplementedError(f"No upsert for the {dialect} dialect")
+    connection.execute(statement)
+
+def inserted_created_at(connection, target):
+    # created_at defaults to the database clock, so after an INSERT it is not known in Python yet
+    created_at = target.__dict__.get("created_at")
+    if isinstance(created_at, datetime):
+        return created_at
+    return connection.execute(select(SalesOpportunity.created_at).where(SalesOpportunity.id == target.id)).scalar()
+
+def previous_value(target, attribute):
+    history = inspect(target).attrs[attribute].history
+    if history.deleted:
+        return history.deleted[0]
+    return getattr(target, attribute)
+
+def keep_previous_value(target, value, oldvalue, initiator):
+    pass
+
+# Load the old value when an expired attribute is assigned, so after_update can subtract it
+for attribute in TRACKED_ATTRIBUTES:
+    event.listen(getattr(SalesOpportunity, attribute), "set", keep_previous_value, active_history=True)
+
+@event.listens_for(SalesOpportunity, "after_insert")
+def add_to_pipeline(mapper, connection, target):
+    for dimension, bucket in buckets(target.sales_stage, target.owner, inserted_created_at(connection, target)):
+        apply_delta(connection, dimension, bucket, 1, amount(target.revenue))
+
+# before_delete: the row (and any expired attributes) can still be loaded
+@event.listens_for(SalesOpportunity, "before_delete")
+def remove_from_pipeline(mapper, connection, target):
+    for dimension, bucket in buckets(target.sales_stage, target.owner, target.created_at):
+        apply_delta(connection, dimension, bucket, -1, -amount(target.revenue))
+
+@event.listens_for(SalesOpportunity, "after_update")
+def move_in_pipeline(mapper, connection, target):
+    old = {name: previous_value(target, name) for name in TRACKED_ATTRIBUTES}
+    new = {name: getattr(target, name) for name in TRACKED_ATTRIBUTES}
+    if old == new:
+        return
+    for dimension, bucket in buckets(old["sales_stage"], old["owner"], old["created_at"]):
+        apply_delta(connection, dimension, bucket, -1, -amount(old["revenue"]))
+    for dimension, bucket in buckets(new["sales_stage"], new["owner"], new["created_at"]):
+        apply_delta(connection, dimension, bucket, 1, amount(new["revenue"]))
+
+def month_expression():
+    if db.engine.dialect.name == "sqlite":
+        return func.strftime("%Y-%m", SalesOpportunity.created_at)
+    return func.date_format(SalesOpportunity.created_at, "%Y-%m")
+
+def computed_rollup():
+    """Aggregates sales_opportunity from scratch into {(dimension, bucket): (opportunities, revenue)}."""
+    expressions = {
+        "stage": SalesOpportunity.sales_stage,
+        "owner": SalesOpportunity.owner,
+        "month": month_expression(),
+    }
+    totals = {}
+    for dimension, expression in expressions.items():
+        rows = db.session.execute(
+            select(expression, func.count(SalesOpportunity.id), func.coalesce(func.sum(SalesOpportunity.revenue), 0))
+            .group_by(expression)
+        )
+        for value, opportunities, revenue in rows:
+            totals[(dimension, bucket_value(value))] = (opportunities, float(revenue))
+    return totals
+
+def stored_rollup():
+    rows = db.session.execute(select(ROLLUP).where(ROLLUP.c.opportunities != 0))
+    return {(row.dimension, row.bucket): (row.opportunities, row.revenue) for row in rows}
+
+def rebuild_pipeline():
+    """Recomputes the rollup table from sales_opportunity. Run with sales writes paused."""
+    totals = computed_rollup()
+    db.session.execute(delete(ROLLUP))
+    if totals:
+        db.session.execute(insert(ROLLUP), [
+            {"dimension": dimension, "bucket": bucket, "opportunities": opportunities, "revenue": revenue}
+            for (dimension, bucket), (opportunities, revenue) in totals.items()
+        ])
+    record_table_writes(db.session, ["sales_pipeline_rollup"])
+    db.session.commit()
+    return len(totals)
+
+def check_pipeline(tolerance=0.01):
+    """Returns a list of (dimension, bucket, stored, expected) rows where the rollup has drifted."""
+    expected = computed_rollup()
+    stored = stored_rollup()
+    mismatches = []
+    for key in sorted(set(expected) | set(stored)):
+        want = expected.get(key, (0, 0.0))
+        have = stored.get(key, (0, 0.0))
+        if want[0] != have[0] or abs(want[1] - have[1]) > tolerance:
+            mismatches.append((key[0], key[1], have, want))
+    return mismatches
+
+def pipeline_summary():
+    """Reads the pipeline breakdowns from the rollup table: O(buckets), independent of table size."""
+    summary = {"by_stage": [], "by_owner": [], "by_month": []}
+    rows = db.session.execute(
+        select(ROLLUP).where(ROLLUP.c.opportunities != 0).order_by(ROLLUP.c.dimension, ROLLUP.c.bucket)
+    )
+    for row in rows:
+        value = row.bucket or None
+        if row.dimension == "stage":
+            summary["by_stage"].append({"sales_stage": value, "count": row.opportunities, "revenue": row.revenue})
+        elif row.dimension == "owner":
+            owner = int(value) if value is not None else None
+            summary["by_owner"].append({"owner": owner, "count": row.opportunities, "revenue": row.revenue})
+        else:
+            summary["by_month"].append({"month": value, "count": row.opportunities, "revenue": row.revenue})
+    return summary
@@ -0,0 +1,151 @@
+import logging
+import re
+import time
+from collections import Counter
+from functools import wraps
+from threading import Lock
+from flask import g, request, has_request_context, current_app
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from config import QUERY_STATS_ENABLED, N_PLUS_ONE_THRESHOLD
+
+logger = logging.getLogger(__name__)
+
+# Placeholder lists from expanding IN (...) parameters, in any DBAPI paramstyle
+PLACEHOLDER_LIST = re.compile(r"\(\s*(?:\?|%s|%\(\w+\)s|:\w+)(?:\s*,\s*(?:\?|%s|%\(\w+\)s|:\w+))*\s*\)")
+WHITESPACE = re.compile(r"\s+")
+# Bookkeeping that is repeated on purpose (one version bump or rollup delta per flush)
+BOOKKEEPING = re.compile(r"\b(table_versions|sales_pipeline_rollup)\b")
+
+class NPlusOneDetected(Exception):
+    """Raised by assert_no_n_plus_one for repeated statements recorded under app.testing."""
+
+# Messages for requests flagged while app.testing; tests check them with assert_no_n_plus_one
+detected = []
+
+def assert_no_n_plus_one():
+    """Raises NPlusOneDetected if any request since the last call repeated a statement, then resets."""
+    messages = detected[:]
+    detected.clear()
+    if messages:
+        raise NPlusOneDetected("; ".join(messages))
+
+def allow_repeats(func):
+    """Marks a view whose repeated statements are intentional (e.g. chunked writes) so they are not flagged."""
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+        g.allow_repeats = True
+        return func(*args, **kwargs)
+    return wrapper
+
+def statement_pattern(statement):
+    """Statement text with IN lists collapsed, so queries differing only in list length group together."""
+    return PLACEHOLDER_LIST.sub("(?)", WHITESPACE.sub(" ", statement).strip())
+
+class RequestQueries:
+    """The statements one request has run so far, with their total time."""
+
+    def __init__(self):
+        self.count = 0
+        self.seconds = 0.0
+        self.patterns = Counter()
+
+    def record(self, statement, seconds):
+        self.count += 1
+        self.seconds += seconds
+        self.patterns[statement_pattern(statement)] += 1
+
+    def repeated(self, threshold):
+        """(pattern, count) for every non-bookkeeping statement run at least threshold times, most repeated first."""
+        return [
+            (pattern, n) for pattern, n in self.patterns.most_common()
+            if n >= threshold and not BOOKKEEPING.search(pattern)
+        ]
+
+class EndpointStats:
+    """Per-endpoint query totals for this worker process."""
+
+    def __init__(self):
+        self._lock = Lock()
+        self._endpoints = {}
+
+    def add(self, endpoint, queries, repeated):
+        with self._lock:
+            stats = self._endpoints.setdefault(endpoint, {
+                "requests": 0, "queries": 0, "db_seconds": 0.0, "max_queries": 0,
+                "n_plus_one": 0, "last_repeated": None,
+            })
+            stats["requests"] += 1
+            stats["queries"] += queries.count
+            stats["db_seconds"] += queries.seconds
+            stats["max_queries"] = max(stats["max_queries"], queries.count)
+            if repeated:
+                stats["n_plus_one"] += 1
+                stats["last_repeated"] = {"statement": repeated[0][0][:500], "count": repeated[0][1]}
+
+    def snapshot(self):
+        with self._lock:
+            endpoints = {name: dict(stats) for name, stats in self._endpoints.items()}
+        for stats in endpoints.values():
+            stats["avg_queries"] = round(stats["queries"] / stats["requests"], 2)
+            stats["avg_db_ms"] = round(stats["db_seconds"] / stats["requests"] * 1000, 3)
+            stats["db_seconds"] = round(stats["db_seconds"], 6)
+        return endpoints
+
+    def reset(self):
+        with self._lock:
+            self._endpoints.clear()
+
+endpoint_stats = EndpointStats()
+
+def current_queries():
+    """The RequestQueries of the request being handled, or None outside a request."""
+    return g.get("queries") if has_request_context() else None
+
+@event.listens_for(Engine, "before_cursor_execute")
+def start_query_timer(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+@event.listens_for(Engine, "after_cursor_execute")
+def record_query(conn, cursor, statement, parameters, context, executemany):
+    started = conn.info["query_started"].pop()
+    queries = current_queries()
+    if queries is not None:
+        queries.record(statement, time.perf_counter() - started)
+
+@event.listens_for(Engine, "handle_error")
+def discard_query_timer(exception_context):
+    # after_cursor_execute does not run for a failed statement
+    conn = exception_context.connection
+    if conn is not None and conn.info.get("query_started"):
+        conn.info["query_started"].pop()
+
+def begin_request():
+    g.request_started = time.perf_counter()
+    g.queries = RequestQueries()
+
+def finish_request(response):
+    queries = g.pop("queries", None)
+    if queries is None:
+        return response
+    total = time.perf_counter() - g.request_started
+    response.headers.add(
+        "Server-Timing",
+        f'db;dur={queries.seconds * 1000:.1f};desc="{queries.count} queries", app;dur={total * 1000:.1f}'
+    )
+    repeated = [] if g.pop("allow_repeats", False) else queries.repeated(N_PLUS_ONE_THRESHOLD)
+    endpoint_stats.add(request.endpoint or "(unmatched)", queries, repeated)
+    if repeated:
+        pattern, count = repeated[0]
+        message = f"{request.method} {request.path} ran the same statement {count} times (likely N+1): {pattern[:300]}"
+        # Never raised here: the request's transaction may already be committed
+        logger.warning(message)
+        if current_app.testing:
+            detected.append(message)
+    return response
+
+def init_query_stats(app):
+    """Counts and times the SQL each request runs; see config.QUERY_STATS_ENABLED."""
+    if QUERY_STATS_ENABLED:
+        app.before_request(begin_request)
+        app.after_request(finish_request)
@@ -1,6 +1,8 @@
 from flask import Blueprint, request, jsonify
 from config import db
 from models import CommunicationLog
+from utils import export_response
+from serializers import communication_serializer
 # from flasgger import swag_from
 
 communication = Blueprint('communication', __name__)
@@ -26,18 +28,12 @@ communication = Blueprint('communication', __name__)
 #     }
 # })
 def get_communications():
-    records = CommunicationLog.query.all()
-    result = [
-        {
-            "id": r.id,
-            "customer_id": r.customer_id,
-            "contact_type": r.contact_type,
-            "details": r.details,
-            "contact_date": r.contact_date
-        }
-        for r in records
-    ]
-    return jsonify(result)
+    return jsonify(communication_serializer.all())
+
+# Export all communication records as NDJSON or CSV
+@communication.route('/export', methods=['GET'])
+def export_communications():
+    return export_response(communication_serializer.columns, "communication_records")
 
 # Add new communication record
 @communication.route('/', methods=['POST'])
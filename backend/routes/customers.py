@@ -1,36 +1,103 @@
+import csv
+import io
+import json
+from itertools import islice
 from flask import Blueprint, jsonify, request
+from sqlalchemy import insert, select
+from sqlalchemy.exc import DBAPIError
 from config import db
 from models import Customer
 from flasgger import swag_from
+from utils import encode_cursor, decode_cursor, parse_ids, parse_limit, escape_like, export_response
+from serializers import customer_serializer
+from caching import conditional_get, record_table_writes, report_cache
+from search import query_terms, rank_customers
+from query_stats import allow_repeats
+from tags import parse_tags, join_tags, tagged_with, insert_customer_tags
 
 customers = Blueprint("customers", __name__)
 
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 500
+
+CUSTOMER_FIELDS = ["name", "email", "phone", "company", "industry", "location", "tags", "technical_evaluator", "address"]
+BULK_CHUNK_SIZE = 1000
+
+def bulk_row_values(row):
+    """Returns (column values, None) for a valid import row, or (None, error message)."""
+    if not isinstance(row, dict):
+        return None, "Row must be an object"
+    values = {}
+    for field in CUSTOMER_FIELDS:
+        value = row.get(field) or None
+        if value is not None and not isinstance(value, str):
+            return None, f"{field} must be a string"
+        length = Customer.__table__.c[field].type.length
+        if value is not None and length and len(value) > length:
+            return None, f"{field} is longer than {length} characters"
+        values[field] = value
+    if not values["name"] or not values["email"]:
+        return None, "name and email are required"
+    return values, None
+
+def customer_filters():
+    """Builds the SQL filters for the ?ids, ?industry, ?location, ?company, ?tag and ?tags list parameters."""
+    filters = []
+    if request.args.get("ids"):
+        filters.append(Customer.id.in_(parse_ids(request.args["ids"])))
+    if request.args.get("industry"):
+        filters.append(Customer.industry == request.args["industry"])
+    if request.args.get("location"):
+        filters.append(Customer.location == request.args["location"])
+    if request.args.get("company"):
+        filters.append(Customer.company.ilike(f"%{escape_like(request.args['company'])}%", escape="\\"))
+    for tag in request.args.getlist("tag") + parse_tags(request.args.get("tags")):
+        filters.append(tagged_with(tag))
+    return filters
+
 # ✅ Get All Customers
 @customers.route("/", methods=["GET"])
 @swag_from({
+    "parameters": [
+        {"name": "ids", "in": "query", "type": "string", "description": "Comma-separated customer IDs to look up in one request"},
+        {"name": "industry", "in": "query", "type": "string", "description": "Exact industry match"},
+        {"name": "location", "in": "query", "type": "string", "description": "Exact location match"},
+        {"name": "company", "in": "query", "type": "string", "description": "Case-insensitive substring of the company name"},
+        {"name": "tag", "in": "query", "type": "string", "description": "Only customers with this tag; repeat for several"},
+        {"name": "tags", "in": "query", "type": "string", "description": "Comma-separated tags, all of which must be present"},
+        {"name": "limit", "in": "query", "type": "integer", "description": f"Page size (max {MAX_PAGE_SIZE}); enables pagination"},
+        {"name": "cursor", "in": "query", "type": "string", "description": "Opaque cursor from a previous page's next_cursor"}
+    ],
     "responses": {
         200: {
-            "description": "Retrieve all customers",
+            "description": "Retrieve all customers, or one page of them when limit/cursor is given",
             "examples": {
-                "application/json": [
-                    {
-                        "id": 1,
-                        "name": "John Doe",
-                        "email": "john@example.com",
-                        "phone": "123456789",
-                        "company": "ABC Corp",
-                        "industry": "Technology",
-                        "location": "Shanghai, China",
-                        "tags": "VIP",
-                        "technical_evaluator": "Mike Lee",
-                        "created_at": "2025-03-02T12:00:00",
-                        "address": "123 Main St, City, Country"
-                    }
-                ]
+                "application/json": {
+                    "customers": [
+                        {
+                            "id": 1,
+                            "name": "John Doe",
+                            "email": "john@example.com",
+                            "phone": "123456789",
+                            "company": "ABC Corp",
+                            "industry": "Technology",
+                            "location": "Shanghai, China",
+                            "tags": "VIP",
+                            "technical_evaluator": "Mike Lee",
+                            "created_at": "2025-03-02T12:00:00",
+                            "address": "123 Main St, City, Country"
+                        }
+                    ],
+                    "next_cursor": "eyJpZCI6IDF9"
+                }
             }
+        },
+        400: {
+            "description": "Invalid ids, limit or cursor"
         }
     }
 })
+@conditional_get("customers")
 def get_customers():
     """
     Get All Customers
@@ -39,28 +106,162 @@ def get_customers():
       - Customers
     responses:
       200:
-        description: List of all customers
+        description: List of customers, paginated by id when limit or cursor is supplied
     """
-    all_customers = Customer.query.all()
-    result = [
-        {
-            "id": c.id,
-            "name": c.name,
-            "email": c.email,
-            "phone": c.phone,
-            "company": c.company,
-            "industry": c.industry,
-            "location": c.location,
-            "tags": c.tags,
-            "technical_evaluator": c.technical_evaluator,
-            "created_at": c.created_at,
-            "address": c.address
+    paginated = "limit" in request.args or "cursor" in request.args
+    try:
+        filters = customer_filters()
+        if paginated:
+            limit = parse_limit(request.args.get("limit"), DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE)
+            cursor = decode_cursor(request.args.get("cursor"))
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    if not paginated:
+        return jsonify(customer_serializer.all(*filters))
+
+    # Keyset pagination: ids are assigned in insertion order, so seeking
+    # past the last id seen costs the same on page 1000 as on page 1.
+    if cursor:
+        filters.append(Customer.id > cursor["id"])
+    result = customer_serializer.all(*filters, limit=limit + 1)
+    next_cursor = None
+    if len(result) > limit:
+        result = result[:limit]
+        next_cursor = encode_cursor({"id": result[-1]["id"]})
+    return jsonify({"customers": result, "next_cursor": next_cursor})
+
+
+# ✅ Search Customers
+@customers.route("/search", methods=["GET"])
+@swag_from({
+    "parameters": [
+        {"name": "q", "in": "query", "type": "string", "required": True, "description": "Words to find in name, company, email, tags, industry or location; each may be a word prefix"},
+        {"name": "industry", "in": "query", "type": "string", "description": "Exact industry match"},
+        {"name": "location", "in": "query", "type": "string", "description": "Exact location match"},
+        {"name": "tag", "in": "query", "type": "string", "description": "Only customers with this tag; repeat for several"},
+        {"name": "limit", "in": "query", "type": "integer", "description": f"Page size (default {DEFAULT_PAGE_SIZE}, max {MAX_PAGE_SIZE})"},
+        {"name": "cursor", "in": "query", "type": "string", "description": "Opaque cursor from a previous page's next_cursor"}
+    ],
+    "responses": {
+        200: {
+            "description": "Customers matching every word of q, most relevant first",
+            "examples": {
+                "application/json": {
+                    "customers": [
+                        {
+                            "id": 1,
+                            "name": "John Doe",
+                            "email": "john@example.com",
+                            "company": "ABC Corp",
+                            "industry": "Technology",
+                            "location": "Shanghai, China",
+                            "tags": "VIP",
+                            "score": 3.27
+                        }
+                    ],
+                    "next_cursor": None
+                }
+            }
+        },
+        400: {
+            "description": "Missing q, or invalid limit or cursor"
         }
-        for c in all_customers
-    ]
-    return jsonify(result)
+    }
+})
+@conditional_get("customers")
+def search_customers():
+    """
+    Search Customers
+    ---
+    tags:
+      - Customers
+    responses:
+      200:
+        description: Ranked, paginated full-text search over customers
+    """
+    terms = query_terms(request.args.get("q", ""))
+    if not terms:
+        return jsonify({"error": "q must contain at least one word"}), 400
+    try:
+        filters = customer_filters()
+        limit = parse_limit(request.args.get("limit"), DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE)
+        cursor = decode_cursor(request.args.get("cursor"))
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    if cursor and not isinstance(cursor.get("score"), (int, float)):
+        return jsonify({"error": "Invalid cursor"}), 400
+
+    result = rank_customers(terms, limit + 1, cursor, filters)
+    next_cursor = None
+    if len(result) > limit:
+        result = result[:limit]
+        next_cursor = encode_cursor({"score": result[-1]["score"], "id": result[-1]["id"]})
+    return jsonify({"customers": result, "next_cursor": next_cursor})
+
+# ✅ Export Customers
+@customers.route("/export", methods=["GET"])
+@swag_from({
+    "parameters": [
+        {"name": "format", "in": "query", "type": "string", "enum": ["ndjson", "csv"], "default": "ndjson"},
+        {"name": "ids", "in": "query", "type": "string"},
+        {"name": "industry", "in": "query", "type": "string"},
+        {"name": "location", "in": "query", "type": "string"},
+        {"name": "company", "in": "query", "type": "string"},
+        {"name": "tag", "in": "query", "type": "string"},
+        {"name": "tags", "in": "query", "type": "string"}
+    ],
+    "responses": {
+        200: {
+            "description": "Streamed export of all matching customers"
+        },
+        400: {
+            "description": "Unsupported format or invalid ids"
+        }
+    }
+})
+def export_customers():
+    """
+    Export Customers
+    ---
+    tags:
+      - Customers
+    """
+    try:
+        filters = customer_filters()
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    return export_response(customer_serializer.columns, "customers", filters)
 
 
+# ✅ Filter Options
+@customers.route("/filter_options", methods=["GET"])
+@swag_from({
+    "responses": {
+        200: {
+            "description": "Every distinct industry and location, for the list page's filter dropdowns",
+            "examples": {
+                "application/json": {
+                    "industries": ["Finance", "Technology"],
+                    "locations": ["Beijing", "Shanghai"]
+                }
+            }
+        }
+    }
+})
+@report_cache.cached("customers")
+def get_filter_options():
+    """
+    Get Customer Filter Options
+    ---
+    tags:
+      - Customers
+    """
+    def distinct(column):
+        return db.session.scalars(select(column).where(column.isnot(None)).distinct().order_by(column)).all()
+
+    return jsonify({"industries": distinct(Customer.industry), "locations": distinct(Customer.location)})
+
 # ✅ Add New Customer
 @customers.route("/", methods=["POST"])
 @swag_from({
@@ -115,6 +316,148 @@ def add_customer():
     db.session.commit()
     return jsonify({"message": "Customer added successfully!"}), 201
 
+# ✅ Bulk Import Customers
+@customers.route("/bulk", methods=["POST"])
+@allow_repeats  # one duplicate check and insert per chunk
+@swag_from({
+    "consumes": ["application/json", "application/x-ndjson", "text/csv"],
+    "requestBody": {
+        "required": True,
+        "content": {
+            "application/json": {
+                "example": [
+                    {"name": "Jane Doe", "email": "jane@example.com", "company": "XYZ Ltd"},
+                    {"name": "Li Wei", "email": "li.wei@example.com", "industry": "Finance"}
+                ]
+            },
+            "application/x-ndjson": {
+                "example": '{"name": "Jane Doe", "email": "jane@example.com"}\n{"name": "Li Wei", "email": "li.wei@example.com"}'
+            },
+            "text/csv": {
+                "example": "name,email,company\nJane Doe,jane@example.com,XYZ Ltd"
+            }
+        }
+    },
+    "responses": {
+        201: {
+            "description": "Import finished; rows that could not be imported are listed in errors",
+            "examples": {
+                "application/json": {
+                    "inserted": 1,
+                    "errors": [{"row": 2, "error": "Email already exists"}]
+                }
+            }
+        },
+        400: {
+            "description": "Body is not a JSON array, NDJSON or CSV"
+        }
+    }
+})
+def bulk_add_customers():
+    """
+    Bulk Import Customers
+    ---
+    tags:
+      - Customers
+    """
+    try:
+        rows = read_bulk_rows()
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    inserted = 0
+    errors = []
+    seen_emails = set()
+    row_number = 0
+
+    while True:
+        chunk = []
+        for row in islice(rows, BULK_CHUNK_SIZE):
+            row_number += 1
+            chunk.append((row_number, row))
+        if not chunk:
+            break
+
+        candidates = []
+        for number, row in chunk:
+            values, error = bulk_row_values(row)
+            if error:
+                errors.append({"row": number, "error": error})
+                continue
+            if values["email"] in seen_emails:
+                errors.append({"row": number, "error": "Duplicate email in upload"})
+                continue
+            seen_emails.add(values["email"])
+            candidates.append((number, values))
+
+        # One set-based duplicate check per chunk instead of one SELECT per row
+        existing = {
+            email for (email,) in db.session.query(Customer.email)
+            .filter(Customer.email.in_([values["email"] for _, values in candidates]))
+        } if candidates else set()
+
+        new_rows = []
+        for number, values in candidates:
+            if values["email"] in existing:
+                errors.append({"row": number, "error": "Email already exists"})
+            else:
+                new_rows.append((number, values))
+
+        if not new_rows:
+            continue
+        try:
+            # A list of parameter sets runs as a single executemany
+            db.session.execute(insert(Customer), [values for _, values in new_rows])
+            tagged = [values["email"] for _, values in new_rows if values["tags"]]
+            if tagged:
+                insert_customer_tags(tagged)
+            record_table_writes(db.session, {"customers", "customer_tags"})
+            db.session.commit()
+            inserted += len(new_rows)
+        except DBAPIError:
+            # Lost a race with a concurrent insert, or the database rejected a value;
+            # retry row by row so only the offending rows are reported
+            db.session.rollback()
+            for number, values in new_rows:
+                try:
+                    db.session.execute(insert(Customer), values)
+                    if values["tags"]:
+                        insert_customer_tags([values["email"]])
+                    record_table_writes(db.session, {"customers", "customer_tags"})
+                    db.session.commit()
+                    inserted += 1
+                except DBAPIError as e:
+                    db.session.rollback()
+                    errors.append({"row": number, "error": str(e.orig)})
+
+    errors.sort(key=lambda e: e["row"])
+    return jsonify({"inserted": inserted, "errors": errors}), 201
+
+def read_bulk_rows():
+    """Yields customer rows from a JSON array, NDJSON or CSV request body, streaming the latter two."""
+    if request.mimetype == "application/json":
+        data = request.get_json(silent=True)
+        if not isinstance(data, list):
+            raise ValueError("Expected a JSON array of customers")
+        return iter(data)
+
+    stream = io.TextIOWrapper(request.stream, encoding="utf-8-sig")
+    if request.mimetype in ("application/x-ndjson", "application/jsonl"):
+        return read_ndjson_rows(stream)
+    if request.mimetype == "text/csv":
+        return csv.DictReader(stream)
+    raise ValueError("Unsupported content type; use application/json, application/x-ndjson or text/csv")
+
+def read_ndjson_rows(stream):
+    for line in stream:
+        if not line.strip():
+            continue
+        try:
+            yield json.loads(line)
+        except ValueError:
+            # Surfaced as a per-row error by bulk_add_customers
+            yield None
+
 # ✅ Get Specific Customer by ID
 @customers.route("/<int:id>", methods=["GET"])
 @swag_from({
@@ -152,6 +495,7 @@ def add_customer():
         }
     }
 })
+@conditional_get("customers")
 def get_customer(id):
     """
     Get Specific Customer
@@ -159,24 +503,10 @@ def get_customer(id):
     tags:
       - Customers
     """
-    customer = Customer.query.get(id)
-    if not customer:
+    result = customer_serializer.first(Customer.id == id)
+    if not result:
         return jsonify({"error": "Customer not found"}), 404
 
-    result = {
-        "id": customer.id,
-        "name": customer.name,
-        "email": customer.email,
-        "phone": customer.phone,
-        "company": customer.company,
-        "industry": customer.industry,
-        "location": customer.location,
-        "tags": customer.tags,
-        "technical_evaluator": customer.technical_evaluator,
-        "created_at": customer.created_at,
-        "address": customer.address
-    }
-    
     return jsonify(result), 200
 
 
@@ -236,3 +566,81 @@ def delete_customer(id):
     db.session.delete(customer)
     db.session.commit()
     return jsonify({"message": "Customer deleted successfully!"}), 200
+
+
+# ✅ Add Tag to Customer
+@customers.route("/<int:id>/tags", methods=["POST"])
+@swag_from({
+    "parameters": [
+        {"name": "id", "in": "path", "required": True, "type": "integer"},
+        {"name": "body", "in": "body", "required": True, "schema": {"properties": {"tag": {"type": "string", "example": "VIP"}}}}
+    ],
+    "responses": {
+        200: {"description": "Customer already had the tag"},
+        201: {
+            "description": "Tag added",
+            "examples": {"application/json": {"tags": ["VIP", "Potential"]}}
+        },
+        400: {"description": "Missing tag, or the customer's tags would exceed 255 characters"},
+        404: {"description": "Customer not found"}
+    }
+})
+def add_customer_tag(id):
+    """
+    Add Tag to Customer
+    ---
+    tags:
+      - Customers
+    """
+    customer = Customer.query.get(id)
+    if not customer:
+        return jsonify({"error": "Customer not found"}), 404
+
+    tag = ((request.json or {}).get("tag") or "").strip()
+    if not tag or "," in tag:
+        return jsonify({"error": "tag must be a non-empty string without commas"}), 400
+    tags = parse_tags(customer.tags)
+    if tag.lower() in (t.lower() for t in tags):
+        return jsonify({"tags": tags}), 200
+
+    tags.append(tag)
+    if len(join_tags(tags)) > Customer.tags.type.length:
+        return jsonify({"error": "Too many tags for this customer"}), 400
+    customer.tags = join_tags(tags)
+    db.session.commit()
+    return jsonify({"tags": tags}), 201
+
+
+# ✅ Remove Tag from Customer
+@customers.route("/<int:id>/tags/<tag>", methods=["DELETE"])
+@swag_from({
+    "parameters": [
+        {"name": "id", "in": "path", "required": True, "type": "integer"},
+        {"name": "tag", "in": "path", "required": True, "type": "string"}
+    ],
+    "responses": {
+        200: {
+            "description": "Tag removed",
+            "examples": {"application/json": {"tags": ["Potential"]}}
+        },
+        404: {"description": "Customer not found, or it does not have the tag"}
+    }
+})
+def remove_customer_tag(id, tag):
+    """
+    Remove Tag from Customer
+    ---
+    tags:
+      - Customers
+    """
+    customer = Customer.query.get(id)
+    if not customer:
+        return jsonify({"error": "Customer not found"}), 404
+
+    tags = parse_tags(customer.tags)
+    remaining = [t for t in tags if t.lower() != tag.strip().lower()]
+    if len(remaining) == len(tags):
+        return jsonify({"error": "Tag not found"}), 404
+    customer.tags = join_tags(remaining)
+    db.session.commit()
+    return jsonify({"tags": remaining}), 200
@@ -5,51 +5,171 @@ from flasgger import swag_from
 
 interactions = Blueprint("interactions", __name__)
 
-from flask import Blueprint, request, jsonify
-from config import db
-from models import CustomerInteraction
 import os
-from werkzeug.utils import secure_filename
+from flask import Blueprint, request, jsonify, send_file, make_response
+from sqlalchemy import select
+from config import db, MAX_UPLOAD_SIZE, UPLOAD_FOLDER, ATTACHMENT_ACCEL_REDIRECT
+from models import CustomerInteraction
+from serializers import interaction_serializer
+from jobs import enqueue
+from job_handlers import thumbnail_path
+from storage import (
+    parse_upload_form, detect_mime_type, start_upload, upload_state, append_chunk, finish_upload,
+    UploadTooLarge, UploadOffsetMismatch
+)
 
 interactions = Blueprint("interactions", __name__)
 
-UPLOAD_FOLDER = "uploads"
-if not os.path.exists(UPLOAD_FOLDER):
-    os.makedirs(UPLOAD_FOLDER)
+# Types a browser may render in place; anything else (HTML, SVG, ...) downloads as an attachment
+INLINE_MIME_PREFIXES = ("image/", "video/", "audio/")
+INLINE_MIME_TYPES = {"application/pdf", "text/plain"}
+INTERACTION_TYPES = CustomerInteraction.__table__.c.interaction_type.type.enums
 
 @interactions.route("/<int:customer_id>", methods=["GET"])
 def get_interactions(customer_id):
-    interactions = CustomerInteraction.query.filter_by(customer_id=customer_id).all()
-    result = [
-        {
-            "id": i.id,
-            "interaction_type": i.interaction_type,
-            "interaction_date": i.interaction_date,
-            "details": i.details,
-            "file_path": i.file_path
-        }
-        for i in interactions
-    ]
-    return jsonify(result)
+    return jsonify(interaction_serializer.all(CustomerInteraction.customer_id == customer_id))
 
 @interactions.route("/<int:customer_id>", methods=["POST"])
 def add_interaction(customer_id):
-    data = request.form
-    file = request.files.get("file")
-    file_path = None
+    """Multipart form with an optional `file`, or `upload_id` of a completed resumable upload."""
+    try:
+        data, files = parse_upload_form(request.environ)
+    except UploadTooLarge as e:
+        return jsonify({"error": str(e)}), 413
+    except ValueError:
+        return jsonify({"error": "Malformed multipart body"}), 400
 
+    file = files.get("file")
+    for _, storage in files.items(multi=True):
+        if storage is not file or not file:
+            storage.stream.discard()
+
+    # Validate before storing the file or consuming the upload, so a rejected request can be retried
+    if data.get("interaction_type") not in INTERACTION_TYPES:
+        if file:
+            file.stream.discard()
+        return jsonify({"error": f"interaction_type must be one of {', '.join(INTERACTION_TYPES)}"}), 400
+
+    attachment = {}
     if file:
-        filename = secure_filename(file.filename)
-        file_path = os.path.join(UPLOAD_FOLDER, filename)
-        file.save(file_path)
+        stored = file.stream.store()
+        attachment = {"file_name": file.filename, "file_mime_type": detect_mime_type(file.filename, file.mimetype)}
+    elif data.get("upload_id"):
+        try:
+            stored, state = finish_upload(data["upload_id"])
+        except LookupError as e:
+            return jsonify({"error": str(e)}), 404
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+        attachment = {"file_name": state["filename"], "file_mime_type": state["mime_type"]}
+    if attachment:
+        attachment.update(
+            file_path=stored.path, file_sha256=stored.sha256, file_size=stored.size, file_scan_status="pending"
+        )
 
     new_interaction = CustomerInteraction(
         customer_id=customer_id,
         interaction_type=data["interaction_type"],
         details=data.get("details"),
-        file_path=file_path
+        **attachment
     )
     db.session.add(new_interaction)
+    if attachment:
+        db.session.flush()
+        enqueue("process_upload", interaction_id=new_interaction.id)
     db.session.commit()
     
     return jsonify({"message": "Interaction added successfully!"}), 201
+
+# Resumable uploads for large attachments: POST /uploads declares the file, PATCH sends
+# chunks at the offset reported by GET, then add_interaction is called with the upload_id.
+@interactions.route("/uploads", methods=["POST"])
+def create_upload():
+    data = request.json or {}
+    if not data.get("filename") or not isinstance(data.get("size"), int) or data["size"] < 0:
+        return jsonify({"error": "filename and a non-negative integer size are required"}), 400
+    try:
+        upload_id = start_upload(data["filename"], data["size"], data.get("mime_type"))
+    except UploadTooLarge as e:
+        return jsonify({"error": str(e)}), 413
+    return jsonify({"upload_id": upload_id, "offset": 0, "size": data["size"], "max_size": MAX_UPLOAD_SIZE}), 201
+
+@interactions.route("/uploads/<upload_id>", methods=["GET"])
+def get_upload(upload_id):
+    state = upload_state(upload_id)
+    if state is None:
+        return jsonify({"error": "Upload not found"}), 404
+    response = jsonify({"upload_id": upload_id, **state})
+    response.headers["Upload-Offset"] = str(state["offset"])
+    return response
+
+@interactions.route("/uploads/<upload_id>", methods=["PATCH"])
+def upload_chunk(upload_id):
+    """Raw chunk bytes in the body; the Upload-Offset header says where they start."""
+    try:
+        offset = int(request.headers["Upload-Offset"])
+    except (KeyError, ValueError):
+        return jsonify({"error": "Upload-Offset header is required"}), 400
+    try:
+        offset = append_chunk(upload_id, offset, request.stream)
+    except LookupError as e:
+        return jsonify({"error": str(e)}), 404
+    except UploadOffsetMismatch as e:
+        return jsonify({"error": str(e), "offset": e.offset}), 409
+    except UploadTooLarge as e:
+        return jsonify({"error": str(e)}), 413
+    response = jsonify({"upload_id": upload_id, "offset": offset})
+    response.headers["Upload-Offset"] = str(offset)
+    return response
+
+@interactions.route("/<int:id>/file", methods=["GET"])
+def get_interaction_file(id):
+    """
+    Serves an interaction's attachment with Range and ETag support; ?download=1 forces a download
+    and ?thumbnail=1 returns the PNG preview made by the process_upload job for images.
+    """
+    row = db.session.execute(
+        select(
+            CustomerInteraction.file_path, CustomerInteraction.file_name,
+            CustomerInteraction.file_sha256, CustomerInteraction.file_mime_type, CustomerInteraction.file_scan_status
+        ).where(CustomerInteraction.id == id)
+    ).first()
+    if not row or not row.file_path:
+        return jsonify({"error": "Attachment not found"}), 404
+    if row.file_scan_status == "infected":
+        return jsonify({"error": "Attachment failed the virus scan"}), 403
+    if request.args.get("thumbnail") == "1":
+        if not row.file_sha256 or not os.path.isfile(thumbnail_path(row.file_sha256)):
+            return jsonify({"error": "No thumbnail for this attachment"}), 404
+        return send_file(thumbnail_path(row.file_sha256), mimetype="image/png", etag=row.file_sha256 + "-thumb", conditional=True)
+    if not os.path.isfile(row.file_path):
+        return jsonify({"error": "Attachment file is missing"}), 404
+
+    file_name = row.file_name or os.path.basename(row.file_path)
+    mime_type = row.file_mime_type or "application/octet-stream"
+    inline = (mime_type.startswith(INLINE_MIME_PREFIXES) or mime_type in INLINE_MIME_TYPES) and mime_type != "image/svg+xml"
+    as_attachment = not inline or request.args.get("download") == "1"
+
+    relative_path = os.path.relpath(row.file_path, UPLOAD_FOLDER)
+    if ATTACHMENT_ACCEL_REDIRECT and not relative_path.startswith(".."):
+        # The proxy streams the file (and handles Range) itself; only answer revalidation here
+        if row.file_sha256 and request.if_none_match.contains(row.file_sha256):
+            response = make_response("", 304)
+        else:
+            response = make_response("")
+            response.headers["X-Accel-Redirect"] = ATTACHMENT_ACCEL_REDIRECT.rstrip("/") + "/" + relative_path.replace(os.sep, "/")
+            response.headers["Content-Type"] = mime_type
+            disposition = "attachment" if as_attachment else "inline"
+            response.headers.set("Content-Disposition", disposition, filename=file_name)
+        if row.file_sha256:
+            response.set_etag(row.file_sha256)
+    else:
+        # send_file hands the open file to the server's wsgi.file_wrapper (sendfile where supported)
+        # and answers Range / If-None-Match itself, so the body is never read into the worker
+        response = send_file(
+            row.file_path, mimetype=mime_type, as_attachment=as_attachment,
+            download_name=file_name, etag=row.file_sha256 or True, conditional=True
+        )
+    response.headers["X-Content-Type-Options"] = "nosniff"
+    response.cache_control.private = True
+    return response
@@ -1,9 +1,27 @@
+import logging
 from flask import Blueprint, request, jsonify
+from sqlalchemy import select
+from sqlalchemy.orm import selectinload
 from config import db
 from models import Project
+from serializers import (
+    project_serializer, project_detail_serializer, customer_project_serializer, funding_serializer,
+    task_serializer, update_log_serializer, support_request_serializer
+)
 from flasgger import swag_from
+from caching import conditional_get
+from jobs import enqueue
 
 projects = Blueprint('projects', __name__)
+logger = logging.getLogger(__name__)
+
+# ?include= values served by get_project_by_id; each relationship costs one extra IN query
+INCLUDE_RELATIONSHIPS = {
+    "tasks": Project.tasks,
+    "update_logs": Project.update_logs,
+    "support_requests": Project.support_requests
+}
+INCLUDE_OPTIONS = set(INCLUDE_RELATIONSHIPS) | {"funding"}
 
 # Get all projects
 @projects.route('/', methods=['GET'])
@@ -26,6 +44,7 @@ projects = Blueprint('projects', __name__)
         }
     }
 })
+@conditional_get("projects")
 def get_all_projects(): 
     """
     Get all projects
@@ -36,19 +55,7 @@ def get_all_projects():
       200:
         description: A list of projects
     """
-    project_list = Project.query.all()
-    result = [
-        {
-            "id": p.id,
-            "customer_id": p.customer_id,
-            "project_name": p.project_name,
-            "budget": p.budget,
-            "phase": p.phase,
-            "manager": p.manager
-        }
-        for p in project_list
-    ]
-    return jsonify(result)
+    return jsonify(project_serializer.all())
 
 # Get all projects for a specific customer
 @projects.route("/customers/<int:customer_id>", methods=["GET"])
@@ -90,20 +97,23 @@ def get_all_projects():
         404: {"description": "Customer not found"}
     }
 })
+@conditional_get("projects")
 def get_projects_by_customer(customer_id): 
-    projects = Project.query.filter_by(customer_id=customer_id).all()
-    return jsonify([{
-        "id": p.id,
-        "project_name": p.project_name,
-        "budget": float(p.budget) if p.budget else None,
-        "phase": p.phase,
-        "manager": p.manager
-    } for p in projects])
+    return jsonify(customer_project_serializer.all(Project.customer_id == customer_id))
     
 
 # Get a specific project by project ID
 @projects.route("/<int:project_id>", methods=["GET"])
 @swag_from({
+    "parameters": [
+        {
+            "name": "include",
+            "in": "query",
+            "required": False,
+            "type": "string",
+            "description": "Comma-separated extras to embed: tasks, update_logs, support_requests, funding"
+        }
+    ],
     "responses": {
         200: {
             "description": "Retrieve project details",
@@ -114,13 +124,19 @@ def get_projects_by_customer(customer_id):
                     "project_name": "CRM System Upgrade",
                     "budget": 50000,
                     "phase": "In Progress",
-                    "manager": "John Doe"
+                    "manager": "John Doe",
+                    "tasks": [
+                        {"id": 1, "description": "Develop backend API", "due_date": "2025-03-15", "assigned_to": "3", "status": "In Progress"}
+                    ],
+                    "funding": {"id": 1, "budget": 50000, "funding_status": "Approved", "approval_date": "2025-03-01T09:00:00", "decision_maker": "John Doe"}
                 }
             }
         },
+        400: {"description": "Unknown include value"},
         404: {"description": "Project not found"}
     }
 })
+@conditional_get("projects", "tasks", "update_logs", "support_requests")
 def get_project_by_id(project_id):
     """
     Get details of a specific project
@@ -134,22 +150,32 @@ def get_project_by_id(project_id):
         type: integer
     responses:
       200:
-        description: Returns project details
+        description: Returns project details, plus any related records named in include
       404:
         description: Project not found
     """
-    project = Project.query.get(project_id)
+    include = {part.strip() for part in request.args.get("include", "").split(",") if part.strip()}
+    unknown = include - INCLUDE_OPTIONS
+    if unknown:
+        return jsonify({"error": f"Unknown include value(s): {', '.join(sorted(unknown))}"}), 400
+
+    statement = select(Project).where(Project.id == project_id).options(
+        *[selectinload(INCLUDE_RELATIONSHIPS[name]) for name in include if name in INCLUDE_RELATIONSHIPS]
+    )
+    project = db.session.execute(statement).scalar_one_or_none()
     if not project:
         return jsonify({"error": "Project not found"}), 404
 
-    return jsonify({
-        "id": project.id,
-        "customer_id": project.customer_id,
-        "project_name": project.project_name,
-        "budget": float(project.budget) if project.budget else None,
-        "phase": project.phase,
-        "manager": project.manager
-    })
+    result = project_detail_serializer.from_object(project)
+    if "tasks" in include:
+        result["tasks"] = [task_serializer.from_object(t) for t in project.tasks]
+    if "update_logs" in include:
+        result["update_logs"] = [update_log_serializer.from_object(log) for log in project.update_logs]
+    if "support_requests" in include:
+        result["support_requests"] = [support_request_serializer.from_object(r) for r in project.support_requests]
+    if "funding" in include:
+        result["funding"] = funding_serializer.from_object(project)
+    return jsonify(result)
 
 
 # Add a new project for a specific customer
@@ -290,21 +316,16 @@ def delete_project(project_id):
         404: {"description": "Project not found"}
     }
 })
+@conditional_get("projects")
 def get_project_funding(project_id):
     """
     Get funding info for a specific project.
     """
-    project = Project.query.get(project_id)
-    if not project:
+    funding = funding_serializer.first(Project.id == project_id)
+    if not funding:
         return jsonify({"error": "Project not found"}), 404
 
-    return jsonify({
-        "id": project.id,
-        "budget": project.budget,
-        "funding_status": project.funding_status,
-        "approval_date": project.approval_date,
-        "decision_maker": project.manager 
-    }), 200
+    return jsonify(funding), 200
 
 # Update funding
 @projects.route("/<int:project_id>/funding", methods=["PUT"])
@@ -349,8 +370,7 @@ def update_project_funding(project_id):
         return jsonify({"error": "Project not found"}), 404
 
     data = request.json
-
-    print("Received request payload:", data)
+    logger.debug("funding update for project %s: %s", project_id, data)
 
     new_status = data.get("funding_status", project.funding_status)
 
@@ -365,6 +385,8 @@ def update_project_funding(project_id):
     elif new_status not in ["Approved", "Funded"]:
         project.approval_date = None  
 
+    if new_status in ["Approved", "Funded"] and project.funding_status != new_status:
+        enqueue("notify_funding_approved", project_id=project.id)
     project.funding_status = new_status 
 
     db.session.commit()
@@ -1,13 +1,34 @@
-from flask import Blueprint, jsonify
+from datetime import datetime, timedelta
+from flask import Blueprint, jsonify, request
 from config import db
 from models import Customer, SalesOpportunity, Project
 from flasgger import swag_from
+from caching import report_cache
+from pipeline import pipeline_summary
 
 reports = Blueprint('reports', __name__)
 
+DATE_RANGE_PARAMETERS = [
+    {"name": "start_date", "in": "query", "type": "string", "format": "date", "description": "Inclusive lower bound (YYYY-MM-DD)"},
+    {"name": "end_date", "in": "query", "type": "string", "format": "date", "description": "Inclusive upper bound (YYYY-MM-DD)"}
+]
+
+def apply_date_range(query, column):
+    """Restricts query to rows whose column falls within ?start_date/?end_date (inclusive)."""
+    start_date = request.args.get("start_date")
+    end_date = request.args.get("end_date")
+    if start_date:
+        query = query.filter(column >= datetime.strptime(start_date, "%Y-%m-%d"))
+    if end_date:
+        query = query.filter(column < datetime.strptime(end_date, "%Y-%m-%d") + timedelta(days=1))
+    return query
+
 # Get Sales Summary Report
 @reports.route('/sales_summary', methods=['GET'])
 @swag_from({
+    "parameters": DATE_RANGE_PARAMETERS + [
+        {"name": "owner", "in": "query", "type": "integer", "description": "Only count opportunities owned by this user ID"}
+    ],
     "responses": {
         200: {
             "description": "Retrieve total sales opportunities and total revenue",
@@ -17,9 +38,13 @@ reports = Blueprint('reports', __name__)
                     "total_revenue": 500000
                 }
             }
+        },
+        400: {
+            "description": "Invalid date or owner filter"
         }
     }
 })
+@report_cache.cached("sales_opportunity")
 def sales_summary():
     """
     Get Sales Summary Report
@@ -28,11 +53,21 @@ def sales_summary():
       - Reports
     responses:
       200:
-        description: Total sales opportunities and total revenue
+        description: Total sales opportunities and total revenue, optionally filtered by creation date and owner
     """
-    sales = SalesOpportunity.query.all()
-    total_revenue = sum([s.revenue for s in sales])
-    return jsonify({"total_sales_opportunities": len(sales), "total_revenue": total_revenue})
+    query = db.session.query(
+        db.func.count(SalesOpportunity.id),
+        db.func.coalesce(db.func.sum(SalesOpportunity.revenue), 0)
+    )
+    try:
+        query = apply_date_range(query, SalesOpportunity.created_at)
+        if request.args.get("owner"):
+            query = query.filter(SalesOpportunity.owner == int(request.args["owner"]))
+    except ValueError:
+        return jsonify({"error": "Invalid filter: dates must be YYYY-MM-DD and owner an integer"}), 400
+
+    total_sales, total_revenue = query.one()
+    return jsonify({"total_sales_opportunities": total_sales, "total_revenue": total_revenue})
 
 # Get Customer Distribution by Industry
 @reports.route('/customer_distribution', methods=['GET'])
@@ -49,6 +84,7 @@ def sales_summary():
         }
     }
 })
+@report_cache.cached("customers")
 def customer_distribution():
     """
     Get Customer Distribution by Industry
@@ -66,6 +102,9 @@ def customer_distribution():
 # Get Project Budget Summary
 @reports.route('/project_budget', methods=['GET'])
 @swag_from({
+    "parameters": DATE_RANGE_PARAMETERS + [
+        {"name": "manager", "in": "query", "type": "string", "description": "Only count projects run by this manager"}
+    ],
     "responses": {
         200: {
             "description": "Retrieve total projects and total budget",
@@ -75,9 +114,13 @@ def customer_distribution():
                     "total_budget": 1200000
                 }
             }
+        },
+        400: {
+            "description": "Invalid date filter"
         }
     }
 })
+@report_cache.cached("projects")
 def project_budget():
     """
     Get Project Budget Summary
@@ -86,8 +129,106 @@ def project_budget():
       - Reports
     responses:
       200:
-        description: Total projects and total budget
+        description: Total projects and total budget, optionally filtered by approval date and manager
+    """
+    query = db.session.query(
+        db.func.count(Project.id),
+        db.func.coalesce(db.func.sum(Project.budget), 0)
+    )
+    try:
+        # Projects carry no creation timestamp, so the date range applies to approval_date.
+        query = apply_date_range(query, Project.approval_date)
+    except ValueError:
+        return jsonify({"error": "Invalid filter: dates must be YYYY-MM-DD"}), 400
+    if request.args.get("manager"):
+        query = query.filter(Project.manager == request.args["manager"])
+
+    total_projects, total_budget = query.one()
+    return jsonify({"total_projects": total_projects, "total_budget": total_budget})
+
+# Get Dashboard Statistics
+@reports.route('/dashboard', methods=['GET'])
+@swag_from({
+    "responses": {
+        200: {
+            "description": "Retrieve the counts and totals shown on the role dashboards",
+            "examples": {
+                "application/json": {
+                    "total_customers": 120,
+                    "total_projects": 15,
+                    "total_sales_opportunities": 42,
+                    "total_revenue": 500000,
+                    "total_budget": 1200000,
+                    "sales_by_stage": [
+                        {"sales_stage": "Proposal Sent", "count": 10, "revenue": 150000}
+                    ],
+                    "projects_by_funding_status": [
+                        {"funding_status": "Approved", "count": 6, "budget": 450000}
+                    ]
+                }
+            }
+        }
+    }
+})
+@report_cache.cached("customers", "sales_opportunity", "sales_pipeline_rollup", "projects")
+def dashboard():
+    """
+    Get Dashboard Statistics
+    ---
+    tags:
+      - Reports
+    responses:
+      200:
+        description: Entity counts, revenue and budget totals, and per-stage/per-funding-status breakdowns
+    """
+    total_customers = db.session.query(db.func.count(Customer.id)).scalar()
+
+    sales_by_stage = pipeline_summary()["by_stage"]
+
+    projects_by_status = db.session.query(
+        Project.funding_status,
+        db.func.count(Project.id),
+        db.func.coalesce(db.func.sum(Project.budget), 0)
+    ).group_by(Project.funding_status).all()
+
+    return jsonify({
+        "total_customers": total_customers,
+        "total_projects": sum(count for _, count, _ in projects_by_status),
+        "total_sales_opportunities": sum(row["count"] for row in sales_by_stage),
+        "total_revenue": sum(row["revenue"] for row in sales_by_stage),
+        "total_budget": sum(budget for _, _, budget in projects_by_status),
+        "sales_by_stage": sales_by_stage,
+        "projects_by_funding_status": [
+            {"funding_status": status, "count": count, "budget": budget}
+            for status, count, budget in projects_by_status
+        ]
+    })
+
+# Get Sales Pipeline Breakdown
+@reports.route('/pipeline', methods=['GET'])
+@swag_from({
+    "responses": {
+        200: {
+            "description": "Retrieve opportunity counts and revenue by sales stage, owner and creation month",
+            "examples": {
+                "application/json": {
+                    "by_stage": [{"sales_stage": "Proposal Sent", "count": 10, "revenue": 150000}],
+                    "by_owner": [{"owner": 3, "count": 7, "revenue": 98000}],
+                    "by_month": [{"month": "2025-03", "count": 4, "revenue": 61000}]
+                }
+            }
+        }
+    }
+})
+@report_cache.cached("sales_opportunity", "sales_pipeline_rollup")
+def sales_pipeline():
+    """
+    Get Sales Pipeline Breakdown
+    ---
+    tags:
+      - Reports
+    responses:
+      200:
+        description: Pipeline totals read from the incrementally maintained rollup table
     """
-    projects = Project.query.all()
-    total_budget = sum([p.budget for p in projects])
-    return jsonify({"total_projects": len(projects), "total_budget": total_budget})
+    return jsonify(pipeline_summary())
@@ -1,13 +1,44 @@
 from flask import Blueprint, request, jsonify
 from config import db
-from models import SalesOpportunity
+from models import SalesOpportunity, User, Customer
+from utils import export_response
+from serializers import sales_serializer
+from caching import conditional_get
 from flasgger import swag_from
 
 sales_opportunity = Blueprint('sales_opportunity', __name__)
 
+EXPAND_PARAMETER = {
+    "name": "expand",
+    "in": "query",
+    "type": "string",
+    "description": "Comma-separated related names to inline: owner (owner_name), customer (customer_name)"
+}
+
+def list_sales(*criteria):
+    """
+    Lists sales opportunities matching criteria, honouring ?expand=owner,customer.
+
+    Expanded names come from outer joins in the same statement, so the response
+    never costs more than one query however many owners and customers it names.
+    """
+    expand = {part.strip() for part in request.args.get("expand", "").split(",") if part.strip()}
+    unknown = expand - {"owner", "customer"}
+    if unknown:
+        return jsonify({"error": f"Unknown expand value(s): {', '.join(sorted(unknown))}"}), 400
+
+    statement = sales_serializer.select(*criteria).order_by(SalesOpportunity.id)
+    if "owner" in expand:
+        statement = statement.add_columns(User.name.label("owner_name")).outerjoin(User, User.id == SalesOpportunity.owner)
+    if "customer" in expand:
+        statement = statement.add_columns(Customer.name.label("customer_name")).outerjoin(Customer, Customer.id == SalesOpportunity.customer_id)
+
+    return jsonify(sales_serializer.dump(db.session.execute(statement)))
+
 # Get all sales opportunities
 @sales_opportunity.route('/', methods=['GET'])
 @swag_from({
+    "parameters": [EXPAND_PARAMETER],
     "responses": {
         200: {
             "description": "Retrieve all sales opportunities",
@@ -26,6 +57,7 @@ sales_opportunity = Blueprint('sales_opportunity', __name__)
         }
     }
 })
+@conditional_get("sales_opportunity", "users", "customers")
 def get_sales():
     """
     Get all sales opportunities
@@ -36,23 +68,36 @@ def get_sales():
       200:
         description: A list of sales opportunities
     """
-    sales_list = SalesOpportunity.query.all()
-    result = [
-        {
-            "id": s.id,
-            "customer_id": s.customer_id,
-            "opportunity": s.opportunity,  
-            "sales_stage": s.sales_stage,  
-            "revenue": s.revenue,  
-            "owner": s.owner  
-        }
-        for s in sales_list
-    ]
-    return jsonify(result)
+    return list_sales()
   
+# Export all sales opportunities
+@sales_opportunity.route('/export', methods=['GET'])
+@swag_from({
+    "parameters": [
+        {"name": "format", "in": "query", "type": "string", "enum": ["ndjson", "csv"], "default": "ndjson"}
+    ],
+    "responses": {
+        200: {
+            "description": "Streamed export of all sales opportunities"
+        },
+        400: {
+            "description": "Unsupported format"
+        }
+    }
+})
+def export_sales():
+    """
+    Export all sales opportunities as NDJSON or CSV
+    ---
+    tags:
+      - Sales
+    """
+    return export_response(sales_serializer.columns + [SalesOpportunity.created_at], "sales_opportunities")
+
 # Get all sales opportunities for a specific customer
 @sales_opportunity.route('/customer/<int:customer_id>', methods=['GET'])
 @swag_from({
+    "parameters": [EXPAND_PARAMETER],
     "responses": {
         200: {
             "description": "Retrieve sales opportunities for a specific customer",
@@ -71,6 +116,7 @@ def get_sales():
         }
     }
 })
+@conditional_get("sales_opportunity", "users", "customers")
 def get_sales_by_customer(customer_id):
     """
     Get all sales opportunities for a specific customer
@@ -86,19 +132,7 @@ def get_sales_by_customer(customer_id):
       200:
         description: A list of sales opportunities for the given customer
     """
-    sales_list = SalesOpportunity.query.filter_by(customer_id=customer_id).all()
-    result = [
-        {
-            "id": s.id,
-            "customer_id": s.customer_id,
-            "opportunity": s.opportunity,  
-            "sales_stage": s.sales_stage,  
-            "revenue": s.revenue,  
-            "owner": s.owner  
-        }
-        for s in sales_list
-    ]
-    return jsonify(result)
+    return list_sales(SalesOpportunity.customer_id == customer_id)
 
 
 # Add a new sales opportunity
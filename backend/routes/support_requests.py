@@ -1,6 +1,7 @@
 from flask import Blueprint, jsonify, request
 from config import db
 from models import SupportRequest
+from serializers import support_request_serializer
 from flasgger import swag_from
 
 support_requests = Blueprint("support_requests", __name__)
@@ -46,14 +47,7 @@ support_requests = Blueprint("support_requests", __name__)
     }
 })
 def get_support_requests(project_id):
-    requests = SupportRequest.query.filter_by(project_id=project_id).all()
-    return jsonify([{
-        "id": r.id,
-        "request_type": r.request_type,
-        "description": r.description,
-        "status": r.status,
-        "requested_by": r.requested_by
-    } for r in requests])
+    return jsonify(support_request_serializer.all(SupportRequest.project_id == project_id))
 
 # Add a new support request
 @support_requests.route("/projects/<int:project_id>", methods=["POST"])
@@ -1,6 +1,9 @@
 from flask import Blueprint, jsonify, request
+from sqlalchemy import inspect
 from config import db
 from models import Task
+from serializers import task_serializer
+from jobs import enqueue
 from flasgger import swag_from
 
 tasks = Blueprint("tasks", __name__)
@@ -46,14 +49,7 @@ tasks = Blueprint("tasks", __name__)
     }
 })
 def get_tasks(project_id):
-    tasks = Task.query.filter_by(project_id=project_id).all()
-    return jsonify([{
-        "id": t.id,
-        "description": t.description,
-        "due_date": t.due_date.strftime("%Y-%m-%d"),
-        "assigned_to": t.assigned_to,
-        "status": t.status
-    } for t in tasks])
+    return jsonify(task_serializer.all(Task.project_id == project_id))
 
 # Add a new task
 @tasks.route("/projects/<int:project_id>", methods=["POST"])
@@ -100,6 +96,9 @@ def add_task(project_id):
         status=data.get("status", "Pending")
     )
     db.session.add(new_task)
+    if new_task.assigned_to:
+        db.session.flush()
+        enqueue("notify_task_assigned", task_id=new_task.id)
     db.session.commit()
     return jsonify({"message": "Task added successfully!"}), 201
 
@@ -148,6 +147,8 @@ def update_task(task_id):
     task.assigned_to = data.get("assigned_to", task.assigned_to)
     task.status = data.get("status", task.status)
 
+    if task.assigned_to and inspect(task).attrs.assigned_to.history.has_changes():
+        enqueue("notify_task_assigned", task_id=task.id)
     db.session.commit()
     return jsonify({"message": "Task updated successfully!"}), 200
 
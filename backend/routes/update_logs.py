@@ -1,6 +1,7 @@
 from flask import Blueprint, jsonify, request
 from config import db
 from models import UpdateLog
+from serializers import update_log_serializer
 from flasgger import swag_from
 
 update_logs = Blueprint("update_logs", __name__)
@@ -46,14 +47,7 @@ update_logs = Blueprint("update_logs", __name__)
     }
 })
 def get_logs(project_id):
-    logs = UpdateLog.query.filter_by(project_id=project_id).all()
-    return jsonify([{
-        "id": log.id,
-        "change_type": log.change_type,
-        "responsible_person": log.responsible_person,
-        "timestamp": log.timestamp,
-        "comment": log.comment
-    } for log in logs])
+    return jsonify(update_log_serializer.all(UpdateLog.project_id == project_id))
 
 # Add a new log entry
 @update_logs.route("/projects/<int:project_id>", methods=["POST"])
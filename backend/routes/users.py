@@ -1,18 +1,30 @@
+import logging
 from flask import Blueprint, request, jsonify
 from flask_jwt_extended import create_access_token, jwt_required, get_jwt_identity
 from models import User
 from flasgger import swag_from
 from config import db
-from flask_bcrypt import Bcrypt
-
-bcrypt = Bcrypt()
+from passwords import HasherBusy
+from utils import parse_ids
+from serializers import user_serializer
+from caching import conditional_get
 
 
 users = Blueprint("users", __name__)
+logger = logging.getLogger(__name__)
 
 # Get all users
 @users.route("/", methods=["GET"])
 @swag_from({
+    "parameters": [
+        {
+            "name": "ids",
+            "in": "query",
+            "required": False,
+            "type": "string",
+            "description": "Comma-separated user IDs to look up in one request"
+        }
+    ],
     "responses": {
         200: {
             "description": "Retrieve all users",
@@ -26,9 +38,13 @@ users = Blueprint("users", __name__)
                     }
                 ]
             }
+        },
+        400: {
+            "description": "Invalid ids parameter"
         }
     }
 })
+@conditional_get("users")
 def get_users():
     """
     Get All Users
@@ -37,14 +53,15 @@ def get_users():
       - Users
     responses:
       200:
-        description: List of all users
+        description: List of all users, or only those named in ids
     """
-    user_list = User.query.all()
-    result = [
-        {"id": u.id, "name": u.name, "email": u.email, "role": u.role}
-        for u in user_list
-    ]
-    return jsonify(result)
+    filters = []
+    if request.args.get("ids"):
+        try:
+            filters.append(User.id.in_(parse_ids(request.args["ids"])))
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+    return jsonify(user_serializer.all(*filters))
 
 #GET a specific user
 @users.route("/<int:user_id>", methods=["GET"])
@@ -81,6 +98,7 @@ def get_users():
         }
     }
 })
+@conditional_get("users")
 def get_user(user_id):
     """
     Get Specific User by ID
@@ -99,16 +117,10 @@ def get_user(user_id):
       404:
         description: User not found
     """
-    user = User.query.get(user_id)
-    if not user:
+    user_data = user_serializer.first(User.id == user_id)
+    if not user_data:
         return jsonify({"error": "User not found"}), 404
 
-    user_data = {
-        "id": user.id,
-        "name": user.name,
-        "email": user.email,
-        "role": user.role
-    }
     return jsonify(user_data), 200
 
 
@@ -144,6 +156,9 @@ def get_user(user_id):
                     "error": "Email already exists"
                 }
             }
+        },
+        503: {
+            "description": "Too many passwords are being hashed on this worker; retry after the Retry-After delay"
         }
     }
 })
@@ -173,6 +188,8 @@ def add_user():
         description: User created successfully
       400:
         description: Email already exists
+      503:
+        description: Password hashing is busy; retry after the Retry-After delay
     """
     data = request.json
     if User.query.filter_by(email=data["email"]).first():
@@ -183,7 +200,10 @@ def add_user():
         email=data["email"],
         role=data["role"],
     )
-    new_user.set_password(data["password"])
+    try:
+        new_user.set_password(data["password"])
+    except HasherBusy as e:
+        return jsonify({"error": str(e)}), 503, {"Retry-After": "1"}
     db.session.add(new_user)
     db.session.commit()
     return jsonify({"message": "User added successfully!"}), 201
@@ -227,6 +247,9 @@ def add_user():
         },
         401: {
             "description": "Invalid email or password"
+        },
+        503: {
+            "description": "Too many logins are being verified on this worker; retry after the Retry-After delay"
         }
     }
 })
@@ -234,9 +257,14 @@ def login():
     data = request.json
     user = User.query.filter_by(email=data["email"]).first()
 
-    # ✅ Use Flask-Bcrypt for password verification
-    if not user or not bcrypt.check_password_hash(user.password, data["password"]):
-        return jsonify({"error": "Invalid email or password"}), 401
+    # ✅ Verify off the request thread; check_password also upgrades hashes made with an old cost factor
+    try:
+        if not user or not user.check_password(data["password"]):
+            return jsonify({"error": "Invalid email or password"}), 401
+    except HasherBusy as e:
+        return jsonify({"error": str(e)}), 503, {"Retry-After": "1"}
+    if db.session.dirty:
+        db.session.commit()
 
     token = create_access_token(identity=user.id, additional_claims={"role": user.role})
 
@@ -322,8 +350,7 @@ def delete_user(id):
 @jwt_required()
 def profile():
     try:
-        current_user_id = get_jwt_identity()  
-        print("Decoded User ID:", current_user_id) 
+        current_user_id = get_jwt_identity()
 
         user = User.query.get(current_user_id)
         if not user:
@@ -336,5 +363,5 @@ def profile():
             "role": user.role
         }), 200
     except Exception as e:
-        print("JWT Error:", str(e))  # 🔍 Log JWT error
+        logger.warning("profile lookup failed: %s", e)
         return jsonify({"error": "Invalid token"}), 401
@@ -0,0 +1,120 @@
+import re
+from bisect import bisect_left
+from collections import defaultdict
+from math import log
+from threading import Lock
+from sqlalchemy import select, or_, and_
+from sqlalchemy.dialects.mysql import match
+from config import db
+from models import Customer, TableVersion
+from serializers import customer_serializer, Serializer
+
+SEARCH_COLUMNS = (
+    Customer.name, Customer.company, Customer.email, Customer.tags, Customer.industry, Customer.location
+)
+FULLTEXT_DIALECTS = ("mysql", "mariadb")
+MAX_QUERY_TERMS = 8
+WORD = re.compile(r"\w+")
+
+def tokenize(text):
+    return WORD.findall(text.lower()) if text else []
+
+def query_terms(q):
+    """Splits ?q= into distinct search terms; punctuation (and so MySQL boolean operators) is dropped."""
+    return list(dict.fromkeys(tokenize(q)))[:MAX_QUERY_TERMS]
+
+class InvertedIndex:
+    """
+    In-process token -> {customer id: occurrences} index over SEARCH_COLUMNS, used where
+    FULLTEXT is unavailable (SQLite test runs). It is rebuilt when the customers table
+    version changes, so it is meant for small tables, not production data.
+    """
+
+    NOT_BUILT = object()
+
+    def __init__(self):
+        self.lock = Lock()
+        self.version = self.NOT_BUILT
+        self.postings = {}
+        self.tokens = []
+
+    def refresh(self):
+        version = db.session.execute(
+            select(TableVersion.version).where(TableVersion.table_name == Customer.__tablename__)
+        ).scalar()
+        with self.lock:
+            if version == self.version:
+                return
+            postings = defaultdict(lambda: defaultdict(int))
+            for row in db.session.execute(select(Customer.id, *SEARCH_COLUMNS)):
+                for value in row[1:]:
+                    for token in tokenize(value):
+                        postings[token][row.id] += 1
+            self.postings = {token: dict(documents) for token, documents in postings.items()}
+            self.tokens = sorted(self.postings)
+            self.version = version
+
+    def expand(self, term):
+        """Yields the indexed tokens starting with term, matching MySQL's "term*" prefix search."""
+        position = bisect_left(self.tokens, term)
+        while position < len(self.tokens) and self.tokens[position].startswith(term):
+            yield self.tokens[position]
+            position += 1
+
+    def search(self, terms):
+        """Returns [(score, id)] of customers matching every term, best first (TF-IDF ranking)."""
+        self.refresh()
+        total = len({id for documents in self.postings.values() for id in documents}) or 1
+        scores = None
+        for term in terms:
+            term_scores = defaultdict(float)
+            for token in self.expand(term):
+                documents = self.postings[token]
+                weight = log(1 + total / len(documents))
+                for id, occurrences in documents.items():
+                    term_scores[id] += occurrences * weight
+            if scores is None:
+                scores = term_scores
+            else:
+                scores = {id: score + term_scores[id] for id, score in scores.items() if id in term_scores}
+            if not scores:
+                return []
+        return sorted(((score, id) for id, score in scores.items()), key=lambda hit: (-hit[0], hit[1]))
+
+customer_index = InvertedIndex()
+
+def fulltext_search(terms, limit, cursor, filters):
+    # Every term is required; the trailing * makes each one a prefix so partial words match
+    relevance = match(*SEARCH_COLUMNS, against=" ".join(f"+{term}*" for term in terms)).in_boolean_mode()
+    statement = customer_serializer.select(relevance, *filters).add_columns(relevance.label("score"))
+    if cursor:
+        statement = statement.where(or_(
+            relevance < cursor["score"],
+            and_(relevance == cursor["score"], Customer.id > cursor["id"])
+        ))
+    statement = statement.order_by(relevance.desc(), Customer.id).limit(limit)
+    return Serializer.dump(db.session.execute(statement))
+
+def indexed_search(terms, limit, cursor, filters):
+    hits = customer_index.search(terms)
+    if cursor:
+        position = (-cursor["score"], cursor["id"])
+        hits = [hit for hit in hits if (-hit[0], hit[1]) > position]
+    # Hits the filters reject leave the page short, so keep taking the next batch until it is full
+    result = []
+    for start in range(0, len(hits), limit):
+        batch = hits[start:start + limit]
+        rows = {row["id"]: row for row in customer_serializer.all(Customer.id.in_([id for _, id in batch]), *filters)}
+        result.extend(dict(rows[id], score=score) for score, id in batch if id in rows)
+        if len(result) >= limit:
+            break
+    return result[:limit]
+
+def rank_customers(terms, limit, cursor=None, filters=()):
+    """
+    Returns up to limit customers matching all terms and filters, ordered by relevance then id,
+    each with a "score". cursor is the {"score", "id"} of the last row of the previous page.
+    """
+    if db.engine.dialect.name in FULLTEXT_DIALECTS:
+        return fulltext_search(terms, limit, cursor, filters)
+    return indexed_search(terms, limit, cursor, filters)
@@ -0,0 +1,139 @@
+import json
+from datetime import date, datetime, timezone
+from decimal import Decimal
+from flask.json.provider import DefaultJSONProvider
+from sqlalchemy import select
+from config import db
+from models import (
+    User, Customer, CustomerInteraction, SalesOpportunity, Project,
+    Task, CommunicationLog, SupportRequest, UpdateLog
+)
+
+try:
+    import orjson
+except ImportError:  # fall back to the standard library encoder
+    orjson = None
+
+def encode_default(value):
+    """Encodes the non-JSON types our rows contain; dates are emitted as ISO 8601."""
+    if isinstance(value, datetime) and value.tzinfo is None:
+        # Stored datetimes are UTC; without an offset browsers would read them as local time
+        return value.replace(tzinfo=timezone.utc).isoformat()
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return float(value)
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+class FastJSONProvider(DefaultJSONProvider):
+    """JSON provider for jsonify() that encodes with orjson when it is installed."""
+
+    def dumps(self, obj, **kwargs):
+        # jsonify passes only separators for compact output; pretty printing (indent) uses json
+        if orjson is not None and set(kwargs) <= {"separators"}:
+            return orjson.dumps(
+                obj, default=encode_default, option=orjson.OPT_NON_STR_KEYS | orjson.OPT_NAIVE_UTC
+            ).decode("utf-8")
+        kwargs.setdefault("default", encode_default)
+        return json.dumps(obj, **kwargs)
+
+    def loads(self, s, **kwargs):
+        if orjson is not None and not kwargs:
+            return orjson.loads(s)
+        return json.loads(s, **kwargs)
+
+class Serializer:
+    """
+    Declares which columns of a model an endpoint returns.
+
+    Queries built from a serializer select just those columns and return plain rows, so
+    listing N records skips constructing N ORM objects and tracking them in the session.
+    """
+
+    def __init__(self, model, *fields, **aliases):
+        """Fields are returned under their attribute name; aliases as output_name="attribute"."""
+        self.model = model
+        self.fields = fields + tuple(aliases)
+        self.attributes = fields + tuple(aliases.values())
+        self.columns = [getattr(model, field) for field in fields] + [
+            getattr(model, attribute).label(alias) for alias, attribute in aliases.items()
+        ]
+        self.converters = {}
+
+    def converting(self, **converters):
+        """Passes the named fields' values through converters (field=function) on output; returns self."""
+        self.converters = converters
+        return self
+
+    def convert(self, item):
+        for field, func in self.converters.items():
+            item[field] = func(item[field])
+        return item
+
+    def select(self, *criteria):
+        """Returns a SELECT of this serializer's columns, for callers that need joins or extra columns."""
+        return select(*self.columns).where(*criteria)
+
+    def all(self, *criteria, order_by=None, limit=None):
+        statement = self.select(*criteria).order_by(order_by if order_by is not None else self.columns[0])
+        if limit is not None:
+            statement = statement.limit(limit)
+        return [self.convert(item) for item in self.dump(db.session.execute(statement))]
+
+    def first(self, *criteria):
+        row = db.session.execute(self.select(*criteria).limit(1)).first()
+        return self.convert(dict(zip(self.fields, row))) if row else None
+
+    @staticmethod
+    def dump(result):
+        """Converts an executed result into a list of dicts keyed by column label."""
+        keys = list(result.keys())
+        return [dict(zip(keys, row)) for row in result]
+
+    def from_object(self, obj):
+        """Serializes an ORM instance that has already been loaded (e.g. via a relationship)."""
+        return self.convert({field: getattr(obj, attribute) for field, attribute in zip(self.fields, self.attributes)})
+
+user_serializer = Serializer(User, "id", "name", "email", "role")
+
+customer_serializer = Serializer(
+    Customer, "id", "name", "email", "phone", "company", "industry", "location",
+    "tags", "technical_evaluator", "created_at", "address"
+)
+
+interaction_serializer = Serializer(
+    CustomerInteraction, "id", "interaction_type", "interaction_date", "details", "file_path",
+    "file_name", "file_sha256", "file_size", "file_mime_type", "file_scan_status"
+)
+
+sales_serializer = Serializer(
+    SalesOpportunity, "id", "customer_id", "opportunity", "sales_stage", "revenue", "owner"
+)
+
+def budget_or_none(budget):
+    # The single-project and per-customer routes have always returned a zero or missing budget as null
+    return float(budget) if budget else None
+
+project_serializer = Serializer(Project, "id", "customer_id", "project_name", "budget", "phase", "manager")
+
+project_detail_serializer = Serializer(
+    Project, "id", "customer_id", "project_name", "budget", "phase", "manager"
+).converting(budget=budget_or_none)
+
+customer_project_serializer = Serializer(
+    Project, "id", "project_name", "budget", "phase", "manager"
+).converting(budget=budget_or_none)
+
+funding_serializer = Serializer(Project, "id", "budget", "funding_status", "approval_date", decision_maker="manager")
+
+task_serializer = Serializer(Task, "id", "description", "due_date", "assigned_to", "status")
+
+communication_serializer = Serializer(
+    CommunicationLog, "id", "customer_id", "contact_type", "details", "contact_date"
+)
+
+support_request_serializer = Serializer(
+    SupportRequest, "id", "request_type", "description", "status", "requested_by"
+)
+
+update_log_serializer = Serializer(UpdateLog, "id", "change_type", "responsible_person", "timestamp", "comment")
@@ -0,0 +1,200 @@
+import fcntl
+import hashlib
+import json
+import mimetypes
+import os
+import re
+import tempfile
+import time
+import uuid
+from collections import namedtuple
+from werkzeug.formparser import parse_form_data
+from config import UPLOAD_FOLDER, MAX_UPLOAD_SIZE, UPLOAD_SESSION_TTL
+
+CHUNK_SIZE = 1024 * 1024
+OBJECTS_FOLDER = os.path.join(UPLOAD_FOLDER, "objects")
+PARTIAL_FOLDER = os.path.join(UPLOAD_FOLDER, "partial")
+TEMP_FOLDER = os.path.join(UPLOAD_FOLDER, "tmp")
+UPLOAD_ID = re.compile(r"^[0-9a-f]{32}$")
+
+StoredFile = namedtuple("StoredFile", "path sha256 size")
+
+class UploadTooLarge(Exception):
+    """Raised mid-stream once an upload passes its size limit; routes answer 413."""
+
+class UploadOffsetMismatch(Exception):
+    """A resumable chunk did not start where the stored data ends; carries the current offset."""
+
+    def __init__(self, offset, message=None):
+        super().__init__(message or f"Upload is at offset {offset}")
+        self.offset = offset
+
+def object_path(sha256):
+    return os.path.join(OBJECTS_FOLDER, sha256[:2], sha256)
+
+def commit_object(temp_path, sha256, size):
+    """Moves a fully written file to its content address, or drops it if that content is already stored."""
+    path = object_path(sha256)
+    if os.path.exists(path):
+        os.remove(temp_path)
+    else:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # Atomic; a concurrent upload of the same content replaces it with identical bytes
+        os.replace(temp_path, path)
+    return StoredFile(path, sha256, size)
+
+def detect_mime_type(filename, declared=None):
+    """Uses the client's declared type unless it is missing or generic, then guesses from the extension."""
+    if declared and declared != "application/octet-stream":
+        return declared
+    return mimetypes.guess_type(filename or "")[0] or "application/octet-stream"
+
+class IncomingFile:
+    """
+    Write target for a streamed upload. Bytes go to a temp file next to the object store and
+    through SHA-256 as they arrive, so the content address is known without a second read.
+    """
+
+    def __init__(self, max_size=MAX_UPLOAD_SIZE):
+        os.makedirs(TEMP_FOLDER, exist_ok=True)
+        fd, self.temp_path = tempfile.mkstemp(dir=TEMP_FOLDER)
+        self.file = os.fdopen(fd, "w+b")
+        self.hash = hashlib.sha256()
+        self.size = 0
+        self.max_size = max_size
+
+    def write(self, data):
+        self.size += len(data)
+        if self.size > self.max_size:
+            raise UploadTooLarge(f"File exceeds the {self.max_size} byte upload limit")
+        self.hash.update(data)
+        return self.file.write(data)
+
+    def __getattr__(self, name):
+        # seek(), read(), ... for werkzeug's FileStorage wrapper
+        return getattr(self.file, name)
+
+    def store(self):
+        self.file.close()
+        return commit_object(self.temp_path, self.hash.hexdigest(), self.size)
+
+    def discard(self):
+        self.file.close()
+        if os.path.exists(self.temp_path):
+            os.remove(self.temp_path)
+
+def parse_upload_form(environ, max_size=MAX_UPLOAD_SIZE):
+    """
+    Parses a multipart request body, streaming each file part into an IncomingFile rather than
+    werkzeug's spooled temp file. Returns (form, files); callers must store() or discard()
+    every file's stream. Raises UploadTooLarge, or ValueError for a malformed body.
+    """
+    incoming = []
+
+    def stream_factory(total_content_length, content_type, filename, content_length=None):
+        incoming.append(IncomingFile(max_size))
+        return incoming[-1]
+
+    try:
+        _, form, files = parse_form_data(environ, stream_factory=stream_factory, silent=False)
+    except BaseException:
+        for file in incoming:
+            file.discard()
+        raise
+    return form, files
+
+# Resumable uploads: the client declares the total size up front, then sends the bytes in
+# any number of chunks, each starting at the offset the server reports. State lives next
+# to the data in PARTIAL_FOLDER, so every worker process sees the same upload.
+
+def partial_paths(upload_id):
+    if not UPLOAD_ID.match(upload_id or ""):
+        return None
+    base = os.path.join(PARTIAL_FOLDER, upload_id)
+    return base, base + ".json"
+
+def expire_uploads(now=None):
+    """Deletes resumable uploads that have received no data for UPLOAD_SESSION_TTL seconds."""
+    if not os.path.isdir(PARTIAL_FOLDER):
+        return
+    cutoff = (now or time.time()) - UPLOAD_SESSION_TTL
+    for name in os.listdir(PARTIAL_FOLDER):
+        path = os.path.join(PARTIAL_FOLDER, name)
+        try:
+            if os.path.getmtime(path) < cutoff:
+                os.remove(path)
+        except FileNotFoundError:
+            pass
+
+def start_upload(filename, size, mime_type=None):
+    """Opens a resumable upload of size bytes and returns its upload_id."""
+    if size > MAX_UPLOAD_SIZE:
+        raise UploadTooLarge(f"File exceeds the {MAX_UPLOAD_SIZE} byte upload limit")
+    expire_uploads()
+    os.makedirs(PARTIAL_FOLDER, exist_ok=True)
+    upload_id = uuid.uuid4().hex
+    data_path, meta_path = partial_paths(upload_id)
+    open(data_path, "xb").close()
+    with open(meta_path, "w") as meta:
+        json.dump({"filename": filename, "size": size, "mime_type": detect_mime_type(filename, mime_type)}, meta)
+    return upload_id
+
+def upload_state(upload_id):
+    """Returns the upload's metadata plus the number of bytes received ("offset"), or None."""
+    paths = partial_paths(upload_id)
+    if not paths or not os.path.exists(paths[1]):
+        return None
+    with open(paths[1]) as meta:
+        state = json.load(meta)
+    try:
+        state["offset"] = os.path.getsize(paths[0])
+    except FileNotFoundError:
+        return None
+    return state
+
+def append_chunk(upload_id, offset, stream):
+    """
+    Appends stream to the upload if offset matches the bytes already received, and returns the
+    new offset. If the client disconnects mid-chunk, whatever arrived is kept for the next retry.
+    """
+    state = upload_state(upload_id)
+    if state is None:
+        raise LookupError("Upload not found")
+    data_path, _ = partial_paths(upload_id)
+    with open(data_path, "ab") as data:
+        # One writer per upload. Never wait for the lock: a blocking flock would stall a gevent
+        # worker's whole hub, so a parallel retry is told to resume from the current offset instead
+        try:
+            fcntl.flock(data, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            current = data.seek(0, os.SEEK_END)
+            raise UploadOffsetMismatch(current, f"Another chunk is being written; upload is at offset {current}")
+        current = data.seek(0, os.SEEK_END)
+        if current != offset:
+            raise UploadOffsetMismatch(current)
+        while True:
+            chunk = stream.read(CHUNK_SIZE)
+            if not chunk:
+                break
+            if current + len(chunk) > state["size"]:
+                raise UploadTooLarge(f"Chunk runs past the declared size of {state['size']} bytes")
+            data.write(chunk)
+            current += len(chunk)
+    return current
+
+def finish_upload(upload_id):
+    """Moves a fully received upload into the object store. Returns (StoredFile, metadata)."""
+    state = upload_state(upload_id)
+    if state is None:
+        raise LookupError("Upload not found")
+    if state["offset"] != state["size"]:
+        raise ValueError(f"Upload is incomplete: {state['offset']} of {state['size']} bytes received")
+    data_path, meta_path = partial_paths(upload_id)
+    # Chunks may have arrived at different workers, so hash the assembled file once here
+    sha256 = hashlib.sha256()
+    with open(data_path, "rb") as data:
+        for chunk in iter(lambda: data.read(CHUNK_SIZE), b""):
+            sha256.update(chunk)
+    stored = commit_object(data_path, sha256.hexdigest(), state["size"])
+    os.remove(meta_path)
+    return stored, state
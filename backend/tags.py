@@ -0,0 +1,49 @@
+from itertools import chain
+from sqlalchemy import event, inspect, insert, select
+from sqlalchemy.orm import Session
+from config import db
+from models import Customer, CustomerTag
+
+def parse_tags(value):
+    """Splits a comma-separated tags string into distinct tags, keeping the first spelling of each."""
+    tags = {}
+    for tag in (value or "").split(","):
+        tag = tag.strip()
+        if tag and tag.lower() not in tags:
+            tags[tag.lower()] = tag
+    return list(tags.values())
+
+def join_tags(tags):
+    return ",".join(tags) or None
+
+def tagged_with(tag):
+    """Filter for customers carrying tag in any case, answered from ix_customer_tags_tag_customer_id."""
+    return Customer.id.in_(select(CustomerTag.customer_id).where(CustomerTag.tag == tag.lower()))
+
+@event.listens_for(Session, "before_flush")
+def sync_customer_tags(session, flush_context, instances):
+    # Every ORM write of Customer.tags (create, PUT, the tag endpoints) updates customer_tags too
+    for customer in chain(session.new, session.dirty):
+        if not isinstance(customer, Customer) or not inspect(customer).attrs.tags.history.has_changes():
+            continue
+        # customer_tags holds lowercased tags so filters match regardless of case or collation;
+        # Customer.tags keeps the spelling the user entered
+        wanted = {tag.lower() for tag in parse_tags(customer.tags)}
+        for row in list(customer.tag_rows):
+            if row.tag in wanted:
+                wanted.discard(row.tag)
+            else:
+                customer.tag_rows.remove(row)
+        customer.tag_rows.extend(CustomerTag(tag=tag) for tag in sorted(wanted))
+
+def insert_customer_tags(emails):
+    """Adds customer_tags rows for customers just inserted with Core, which skips the flush hook."""
+    rows = [
+        {"customer_id": id, "tag": tag.lower()}
+        for id, tags in db.session.execute(
+            select(Customer.id, Customer.tags).where(Customer.email.in_(emails), Customer.tags.isnot(None))
+        )
+        for tag in parse_tags(tags)
+    ]
+    if rows:
+        db.session.execute(insert(CustomerTag), rows)
@@ -1,9 +1,89 @@
-from flask import request, jsonify
+from flask import request, jsonify, Response, stream_with_context
 from functools import wraps
+from collections import OrderedDict
+from itertools import chain
+from datetime import date, datetime
+from threading import Lock
+import time
+import base64
+import csv
+import io
+import json
 import jwt
-from config import SECRET_KEY
+from sqlalchemy import event, select
+from sqlalchemy.orm import Session
+from config import SECRET_KEY, USER_CACHE_SIZE, USER_CACHE_TTL, TRUST_JWT_ROLE_CLAIM
 from models import User, db
 
+class TTLCache:
+    """Thread-safe, size-bounded LRU cache whose entries expire after ttl seconds."""
+
+    MISSING = object()
+
+    def __init__(self, maxsize, ttl):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = Lock()
+
+    def get(self, key, default=MISSING):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return default
+            value, expires_at = entry
+            if expires_at < time.monotonic():
+                del self._entries[key]
+                return default
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        with self._lock:
+            self._entries[key] = (value, time.monotonic() + self.ttl)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def delete(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+# user id -> role (None for ids with no user), shared by every role_required route
+user_role_cache = TTLCache(USER_CACHE_SIZE, USER_CACHE_TTL)
+
+def get_user_role(user_id):
+    """Returns the role of the given user, or None if no such user exists."""
+    role = user_role_cache.get(user_id)
+    if role is TTLCache.MISSING:
+        role = db.session.query(User.role).filter_by(id=user_id).scalar()
+        user_role_cache.set(user_id, role)
+    return role
+
+@event.listens_for(Session, "after_flush")
+def collect_changed_users(session, flush_context):
+    # Covers users.add_user, users.delete_user and any role change, wherever it is made.
+    # Evicting here would let a concurrent request re-cache the old role before the commit.
+    user_ids = {
+        user.id for user in chain(session.new, session.dirty, session.deleted) if isinstance(user, User)
+    }
+    if user_ids:
+        session.info.setdefault("changed_user_ids", set()).update(user_ids)
+
+@event.listens_for(Session, "after_commit")
+def invalidate_user_roles_after_commit(session):
+    # Other worker processes pick the change up once their entry's TTL expires
+    for user_id in session.info.pop("changed_user_ids", ()):
+        user_role_cache.delete(user_id)
+
+@event.listens_for(Session, "after_rollback")
+def forget_changed_users_after_rollback(session):
+    session.info.pop("changed_user_ids", None)
+
 def role_required(allowed_roles):
     def decorator(func):
         @wraps(func)
@@ -13,16 +93,115 @@ def role_required(allowed_roles):
                 return jsonify({"error": "Unauthorized"}), 401
             
             try:
-                decoded_token = jwt.decode(token.split(" ")[1], SECRET_KEY, algorithms=["HS256"])
-                user = User.query.get(decoded_token["user_id"])
-
-                if not user or user.role not in allowed_roles:
-                    return jsonify({"error": "Access Denied"}), 403
-                
-                return func(*args, **kwargs)
+                # users.login issues tokens via flask_jwt_extended, which stores the (integer) id in "sub"
+                decoded_token = jwt.decode(token.split(" ")[1], SECRET_KEY, algorithms=["HS256"], options={"verify_sub": False})
+                user_id = int(decoded_token.get("user_id", decoded_token.get("sub")))
             except jwt.ExpiredSignatureError:
                 return jsonify({"error": "Token expired"}), 401
-            except jwt.InvalidTokenError:
+            except (jwt.InvalidTokenError, IndexError, TypeError, ValueError):
                 return jsonify({"error": "Invalid token"}), 401
+
+            if TRUST_JWT_ROLE_CLAIM and "role" in decoded_token:
+                role = decoded_token["role"]
+            else:
+                role = get_user_role(user_id)
+
+            if role not in allowed_roles:
+                return jsonify({"error": "Access Denied"}), 403
+
+            return func(*args, **kwargs)
         return wrapper
     return decorator
+
+
+def encode_cursor(position):
+    """Encodes a keyset position (e.g. {"id": 42}) as an opaque URL-safe cursor."""
+    return base64.urlsafe_b64encode(json.dumps(position).encode("utf-8")).decode("ascii")
+
+def decode_cursor(cursor):
+    """Decodes a cursor produced by encode_cursor. Returns None for an empty cursor."""
+    if not cursor:
+        return None
+    try:
+        position = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+    except (ValueError, UnicodeError):
+        raise ValueError("Invalid cursor")
+    if not isinstance(position, dict) or not isinstance(position.get("id"), int):
+        raise ValueError("Invalid cursor")
+    return position
+
+MAX_LOOKUP_IDS = 1000
+
+def parse_ids(value):
+    """Parses a comma-separated ?ids= parameter into a list of distinct integer ids."""
+    try:
+        ids = {int(part) for part in value.split(",") if part.strip()}
+    except ValueError:
+        raise ValueError("ids must be a comma-separated list of integers")
+    if len(ids) > MAX_LOOKUP_IDS:
+        raise ValueError(f"At most {MAX_LOOKUP_IDS} ids can be looked up at once")
+    return sorted(ids)
+
+def parse_limit(value, default, maximum):
+    """Parses a page-size query parameter, clamping it to [1, maximum]."""
+    if value is None or value == "":
+        return default
+    try:
+        limit = int(value)
+    except ValueError:
+        raise ValueError("limit must be an integer")
+    if limit < 1:
+        raise ValueError("limit must be positive")
+    return min(limit, maximum)
+
+def escape_like(value, escape="\\"):
+    """Escapes LIKE wildcards in value so it matches literally; pass the same escape to like()/ilike()."""
+    return value.replace(escape, escape * 2).replace("%", escape + "%").replace("_", escape + "_")
+
+
+EXPORT_BATCH_SIZE = 1000
+
+def export_value(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    return value
+
+def export_response(columns, name, where=()):
+    """
+    Streams the given columns of every matching row as NDJSON (default) or CSV (?format=csv).
+
+    Rows are fetched through a server-side cursor EXPORT_BATCH_SIZE at a time and written
+    out as they arrive, so memory use does not grow with the size of the table.
+    """
+    export_format = request.args.get("format", "ndjson")
+    if export_format not in ("ndjson", "csv"):
+        return jsonify({"error": "format must be ndjson or csv"}), 400
+
+    fields = [column.key for column in columns]
+    statement = select(*columns).where(*where).order_by(columns[0]).execution_options(yield_per=EXPORT_BATCH_SIZE)
+
+    def generate():
+        rows = db.session.execute(statement)
+        if export_format == "csv":
+            buffer = io.StringIO()
+            writer = csv.writer(buffer)
+            writer.writerow(fields)
+            for partition in rows.partitions():
+                writer.writerows([export_value(v) for v in row] for row in partition)
+                yield buffer.getvalue()
+                buffer.seek(0)
+                buffer.truncate()
+        else:
+            for partition in rows.partitions():
+                yield "".join(
+                    json.dumps(dict(zip(fields, map(export_value, row)))) + "\n"
+                    for row in partition
+                )
+
+    mimetype = "text/csv" if export_format == "csv" else "application/x-ndjson"
+    extension = "csv" if export_format == "csv" else "ndjson"
+    return Response(
+        stream_with_context(generate()),
+        mimetype=mimetype,
+        headers={"Content-Disposition": f"attachment; filename={name}.{extension}"}
+    )
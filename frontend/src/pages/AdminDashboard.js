@@ -56,16 +56,12 @@ function AdminDashboard() {
             return;
         }
 
-        Promise.all([
-            axios.get("http://127.0.0.1:5000/customers", { headers: { Authorization: `Bearer ${token}` } }),
-            axios.get("http://127.0.0.1:5000/projects", { headers: { Authorization: `Bearer ${token}` } }),
-            axios.get("http://127.0.0.1:5000/sales_opportunity", { headers: { Authorization: `Bearer ${token}` } })
-        ])
-        .then(([customersRes, projectsRes, salesRes]) => {
+        axios.get("http://127.0.0.1:5000/reports/dashboard", { headers: { Authorization: `Bearer ${token}` } })
+        .then((response) => {
             setStats({
-                customers: customersRes.data.length,
-                projects: projectsRes.data.length,
-                salesOpportunities: salesRes.data.length
+                customers: response.data.total_customers,
+                projects: response.data.total_projects,
+                salesOpportunities: response.data.total_sales_opportunities
             });
         })
         .catch(() => {
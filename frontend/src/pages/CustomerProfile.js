@@ -1,7 +1,7 @@
 import { useEffect, useState } from "react";
 import { useParams, useNavigate } from "react-router-dom";
 import axios from "axios";
-import { Container, Card, Table, Button, Form, Modal, Alert } from "react-bootstrap";
+import { Container, Card, Table, Button, Form, Modal, Alert, Badge } from "react-bootstrap";
 
 function CustomerProfile() {
     const { id } = useParams();
@@ -64,15 +64,28 @@ function CustomerProfile() {
         }
     };
     
-    const handleTagChange = (e) => {
-        const newTag = e.target.value;
-        axios.put(`http://127.0.0.1:5000/customers/${id}`, { tags: newTag }, {
+    const customerTags = (customer?.tags || "").split(",").map(tag => tag.trim()).filter(Boolean);
+
+    const handleAddTag = (e) => {
+        const tag = e.target.value;
+        if (!tag) return;
+        axios.post(`http://127.0.0.1:5000/customers/${id}/tags`, { tag }, {
             headers: { Authorization: `Bearer ${localStorage.getItem("token")}` }
         })
-        .then(() => {
-            setCustomer(prev => ({ ...prev, tags: newTag }));
+        .then((res) => {
+            setCustomer(prev => ({ ...prev, tags: res.data.tags.join(",") }));
         })
-        .catch(() => alert("Failed to update tag"));
+        .catch(() => alert("Failed to add tag"));
+    };
+
+    const handleRemoveTag = (tag) => {
+        axios.delete(`http://127.0.0.1:5000/customers/${id}/tags/${encodeURIComponent(tag)}`, {
+            headers: { Authorization: `Bearer ${localStorage.getItem("token")}` }
+        })
+        .then((res) => {
+            setCustomer(prev => ({ ...prev, tags: res.data.tags.join(",") }));
+        })
+        .catch(() => alert("Failed to remove tag"));
     };
 
 
@@ -111,11 +124,18 @@ function CustomerProfile() {
                     <strong>Industry:</strong> {customer.industry} <br />
                     <strong>Location:</strong> {customer.location} <br />
                     <strong>Technical Evaluator:</strong> {customer.technical_evaluator} <br />
-                    <strong>Tag:</strong>
-                    <Form.Select value={customer.tags} onChange={handleTagChange} className="mt-2">
-                        <option value="VIP">VIP</option>
-                        <option value="Potential">Potential</option>
-                        <option value="Archived">Archived</option>
+                    <strong>Tags:</strong>{" "}
+                    {customerTags.map((tag) => (
+                        <Badge key={tag} bg="secondary" className="me-1">
+                            {tag}{" "}
+                            <span role="button" aria-label={`Remove ${tag}`} onClick={() => handleRemoveTag(tag)}>×</span>
+                        </Badge>
+                    ))}
+                    <Form.Select value="" onChange={handleAddTag} className="mt-2">
+                        <option value="">Add tag...</option>
+                        {["VIP", "Potential", "Archived"].filter(tag => !customerTags.includes(tag)).map((tag) => (
+                            <option key={tag} value={tag}>{tag}</option>
+                        ))}
                     </Form.Select>
                 </Card.Text>
 
@@ -158,7 +178,7 @@ function CustomerProfile() {
                             <td>{interaction.interaction_type}</td>
                             <td>{interaction.interaction_date}</td>
                             <td>{interaction.details}</td>
-                            <td>{interaction.file_path ? <a href={`http://127.0.0.1:5000/${interaction.file_path}`} target="_blank">View File</a> : "N/A"}</td>
+                            <td>{interaction.file_path ? <a href={`http://127.0.0.1:5000/interactions/${interaction.id}/file`} target="_blank" rel="noreferrer">{interaction.file_name || "View File"}</a> : "N/A"}</td>
                         </tr>
                     ))}
                 </tbody>
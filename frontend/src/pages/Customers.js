@@ -3,48 +3,66 @@ import { useNavigate } from "react-router-dom";
 import axios from "axios";
 import { Container, Button, Table, Alert, Form } from "react-bootstrap";
 
+const PAGE_SIZE = 100;
+
+const API_URL = "http://127.0.0.1:5000/customers";
+
+// One page of customers matching filters: server-side search for a non-empty query, otherwise the list
+function fetchCustomers(query, filters, cursor) {
+    const headers = { Authorization: `Bearer ${localStorage.getItem("token")}` };
+    // Empty filters mean "All" and are left out of the query string
+    const params = { limit: PAGE_SIZE, cursor };
+    Object.entries(filters).forEach(([name, value]) => {
+        if (value) params[name] = value;
+    });
+    const request = query.trim()
+        ? axios.get(`${API_URL}/search`, { headers, params: { ...params, q: query } })
+        : axios.get(API_URL, { headers, params });
+    return request.then((response) => response.data);
+}
+
 function Customers() {
     const navigate = useNavigate();
     const [customers, setCustomers] = useState([]);
-    const [filteredCustomers, setFilteredCustomers] = useState([]);
+    const [nextCursor, setNextCursor] = useState(null);
+    const [filterOptions, setFilterOptions] = useState({ industries: [], locations: [] });
     const [error, setError] = useState(null);
 
     const [industryFilter, setIndustryFilter] = useState("");
-    const [salesStageFilter, setSalesStageFilter] = useState("");
     const [locationFilter, setLocationFilter] = useState("");
     const [tagFilter, setTagFilter] = useState("");
+    const [searchQuery, setSearchQuery] = useState("");
 
     useEffect(() => {
-        axios.get("http://127.0.0.1:5000/customers", {
+        // Options cover every customer, not just the pages loaded so far
+        axios.get(`${API_URL}/filter_options`, {
             headers: { Authorization: `Bearer ${localStorage.getItem("token")}` }
         })
-        .then((response) => {
-            setCustomers(response.data);
-            setFilteredCustomers(response.data);
-        })
-        .catch(() => setError("Failed to load customers."));
+            .then((response) => setFilterOptions(response.data))
+            .catch(() => setError("Failed to load filter options."));
     }, []);
 
     useEffect(() => {
-        let filtered = customers;
+        // Any filter change starts again from the first page; typing is debounced
+        const timer = setTimeout(() => {
+            fetchCustomers(searchQuery, { industry: industryFilter, location: locationFilter, tag: tagFilter })
+                .then((data) => {
+                    setCustomers(data.customers);
+                    setNextCursor(data.next_cursor);
+                })
+                .catch(() => setError("Failed to load customers."));
+        }, searchQuery ? 250 : 0);
+        return () => clearTimeout(timer);
+    }, [searchQuery, industryFilter, locationFilter, tagFilter]);
 
-        if (industryFilter) {
-            filtered = filtered.filter(c => c.industry === industryFilter);
-        }
-        if (salesStageFilter) {
-            filtered = filtered.filter(c => c.sales_stage === salesStageFilter);
-        }
-        if (locationFilter) {
-            filtered = filtered.filter(c => c.location === locationFilter);
-        }
-        if (tagFilter) {
-            filtered = filtered.filter(c => c.tags === tagFilter);
-        }
-
-        setFilteredCustomers(filtered);
-    }, [industryFilter, salesStageFilter, locationFilter, tagFilter, customers]);
-
-    const getUniqueValues = (key) => [...new Set(customers.map(c => c[key]))];
+    const loadMore = () => {
+        fetchCustomers(searchQuery, { industry: industryFilter, location: locationFilter, tag: tagFilter }, nextCursor)
+            .then((data) => {
+                setCustomers((loaded) => [...loaded, ...data.customers]);
+                setNextCursor(data.next_cursor);
+            })
+            .catch(() => setError("Failed to load customers."));
+    };
 
     return (
         <>
@@ -53,12 +71,22 @@ function Customers() {
                 {error && <Alert variant="danger">{error}</Alert>}
 
                 {/* ✅ Filter Section */}
-                <Form className="d-flex gap-3 my-3">
+                <Form className="d-flex gap-3 my-3" onSubmit={(e) => e.preventDefault()}>
+                    <Form.Group>
+                        <Form.Label>Search</Form.Label>
+                        <Form.Control
+                            type="search"
+                            placeholder="Name, company, email..."
+                            value={searchQuery}
+                            onChange={(e) => setSearchQuery(e.target.value)}
+                        />
+                    </Form.Group>
+
                     <Form.Group>
                         <Form.Label>Industry</Form.Label>
                         <Form.Select onChange={(e) => setIndustryFilter(e.target.value)}>
                             <option value="">All</option>
-                            {getUniqueValues("industry").map((ind) => (
+                            {filterOptions.industries.map((ind) => (
                                 <option key={ind} value={ind}>{ind}</option>
                             ))}
                         </Form.Select>
@@ -68,7 +96,7 @@ function Customers() {
                         <Form.Label>Location</Form.Label>
                         <Form.Select onChange={(e) => setLocationFilter(e.target.value)}>
                             <option value="">All</option>
-                            {getUniqueValues("location").map((loc) => (
+                            {filterOptions.locations.map((loc) => (
                                 <option key={loc} value={loc}>{loc}</option>
                             ))}
                         </Form.Select>
@@ -101,7 +129,7 @@ function Customers() {
                             </tr>
                         </thead>
                         <tbody>
-                            {filteredCustomers.map((customer) => (
+                            {customers.map((customer) => (
                                 <tr key={customer.id}>
                                     <td>{customer.id}</td>
                                     <td>{customer.name}</td>
@@ -120,6 +148,11 @@ function Customers() {
                         </tbody>
                     </Table>
                 </div>
+                {nextCursor && (
+                    <Button variant="secondary" onClick={loadMore}>
+                        Load More
+                    </Button>
+                )}
             </Container>
         </>
     );
@@ -33,34 +33,18 @@ function ProjectDetails() {
 
 
     useEffect(() => {
-        // Fetch Project Details
-        axios.get(`http://127.0.0.1:5000/projects/${projectId}`)
-            .then(res => setProject(res.data))
-            .catch(() => setError("Failed to load project details"));
-
-        // Fetch Tasks
-        axios.get(`http://127.0.0.1:5000/tasks/projects/${projectId}`)
+        // Fetch the project with its tasks, logs, resource requests and funding in one request
+        axios.get(`http://127.0.0.1:5000/projects/${projectId}?include=tasks,update_logs,support_requests,funding`)
             .then(res => {
-                setTasks(res.data);
-                fetchUserNames(res.data);
+                const { tasks, update_logs, support_requests, funding, ...projectDetails } = res.data;
+                setProject(projectDetails);
+                setTasks(tasks);
+                fetchUserNames(tasks);
+                setLogs(update_logs);
+                setResourceRequests(support_requests);
+                setFunding(funding);
             })
-            .catch(() => setError("Failed to load tasks"));
-
-        // Fetch Logs
-        axios.get(`http://127.0.0.1:5000/update_logs/projects/${projectId}`)
-            .then(res => setLogs(res.data))
-            .catch(() => setError("Failed to load update logs"));
-
-        // Fetch Resource Requests
-        axios.get(`http://127.0.0.1:5000/support_requests/projects/${projectId}`)
-            .then(res => setResourceRequests(res.data))
-            .catch(() => setError("Failed to load resource requests"));
-            
-        axios.get(`http://127.0.0.1:5000/projects/${projectId}/funding`)
-        .then(res => setFunding(res.data))
-        .catch(() => setError("Failed to load funding information"));
-        
-        
+            .catch(() => setError("Failed to load project details"));
     }, [projectId]);
 
     useEffect(() => {
@@ -82,19 +66,17 @@ function ProjectDetails() {
 
 
     const fetchUserNames = async (tasks) => {
-        const userIds = [...new Set(tasks.map(task => task.assigned_to))]; 
+        const userIds = [...new Set(tasks.map(task => task.assigned_to))].filter(userId => userId && !users[userId]);
+        if (userIds.length === 0) return;
         let userData = { ...users };
 
-        await Promise.all(userIds.map(async (userId) => {
-            if (!userData[userId]) {
-                try {
-                    const response = await axios.get(`http://127.0.0.1:5000/users/${userId}`);
-                    userData[userId] = response.data.name;
-                } catch {
-                    userData[userId] = "Unknown"; 
-                }
-            }
-        }));
+        try {
+            const response = await axios.get(`http://127.0.0.1:5000/users?ids=${userIds.join(",")}`);
+            response.data.forEach(user => { userData[user.id] = user.name; });
+        } catch {
+            // Fall through: every id not resolved below is shown as "Unknown"
+        }
+        userIds.forEach(userId => { if (!userData[userId]) userData[userId] = "Unknown"; });
 
         setUsers(userData);
     };
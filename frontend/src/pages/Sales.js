@@ -38,10 +38,11 @@ function Sales() {
 
     const fetchOpportunities = async () => {
         try {
-            const response = await axios.get('http://127.0.0.1:5000/sales_opportunity');
+            const response = await axios.get('http://127.0.0.1:5000/sales_opportunity?expand=owner,customer');
             setOpportunities(response.data);
-            fetchUserNames(response.data);
-            fetchCustomerNames(response.data);
+            // Owner and customer names arrive inline, so no follow-up lookups are needed
+            setUsers(Object.fromEntries(response.data.map(op => [op.owner, op.owner_name || "Unknown"])));
+            setCustomers(Object.fromEntries(response.data.map(op => [op.customer_id, op.customer_name || "Unknown"])));
         } catch (err) {
             setError('Failed to fetch sales opportunities.');
         }
@@ -57,42 +58,6 @@ function Sales() {
         }
     };
 
-    const fetchUserNames = async (opportunities) => {
-        const userIds = [...new Set(opportunities.map(op => op.owner))]; 
-        let userData = { ...users };
-
-        await Promise.all(userIds.map(async (userId) => {
-            if (!userData[userId]) {
-                try {
-                    const response = await axios.get(`http://127.0.0.1:5000/users/${userId}`);
-                    userData[userId] = response.data.name;
-                } catch {
-                    userData[userId] = "Unknown"; 
-                }
-            }
-        }));
-
-        setUsers(userData);
-    };
-
-    const fetchCustomerNames = async (opportunities) => {
-        const customerIds = [...new Set(opportunities.map(op => op.customer_id))]; 
-        let customerData = { ...customers };
-
-        await Promise.all(customerIds.map(async (customerId) => {
-            if (!customerData[customerId]) {
-                try {
-                    const response = await axios.get(`http://127.0.0.1:5000/customers/${customerId}`);
-                    customerData[customerId] = response.data.name;
-                } catch {
-                    customerData[customerId] = "Unknown"; 
-                }
-            }
-        }));
-
-        setCustomers(customerData);
-    };
-
     const fetchAllCustomerNames = async () => {
         try {
             const response = await axios.get("http://127.0.0.1:5000/customers");
@@ -42,14 +42,11 @@ function SalesDashboard() {
             return;
         }
 
-        Promise.all([
-            axios.get("http://127.0.0.1:5000/customers", { headers: { Authorization: `Bearer ${token}` } }),
-            axios.get("http://127.0.0.1:5000/sales_opportunity", { headers: { Authorization: `Bearer ${token}` } })
-        ])
-        .then(([customersRes, salesRes]) => {
+        axios.get("http://127.0.0.1:5000/reports/dashboard", { headers: { Authorization: `Bearer ${token}` } })
+        .then((response) => {
             setStats({
-                customers: customersRes.data.length,
-                salesOpportunities: salesRes.data.length
+                customers: response.data.total_customers,
+                salesOpportunities: response.data.total_sales_opportunities
             });
         })
         .catch(() => {